@@ -1,10 +1,15 @@
 from fastapi import status
 from fastapi.testclient import TestClient
+import bcrypt
 import pytest
 
 from main import app
 from system.bootloader import Bootloader
 from apps.user.utils.managers import UserCRUDManager
+from apps.auth.utils.managers import AppAuthManager, shutdown_bcrypt_pool
+from core.caches import TTLCache
+from core.token_generators import LoginTokenGenerator
+from settings.base import SERVER
 
 user_info = None
 
@@ -47,6 +52,9 @@ def test_success_get_login_token(api: TestClient):
     assert res.status_code == status.HTTP_201_CREATED
     assert 'token' in res.json()
     assert res.json()['user_id'] == user_info['id']
+    # 토큰에도 user_id가 포함된다.
+    decoded = LoginTokenGenerator().decode(res.json()['token'])
+    assert decoded['user_id'] == user_info['id']
 
 def test_passwd_failed_while_get_login_token(api: TestClient):
     """
@@ -61,3 +69,51 @@ def test_passwd_failed_while_get_login_token(api: TestClient):
     res = api.post('/api/auth/token', json=req)
     assert res.status_code == status.HTTP_400_BAD_REQUEST
     assert res.json()['detail'] == '입력한 정보가 맞지 않습니다.'
+
+def test_cache_disabled_with_workers(monkeypatch):
+    """
+    워커가 여러 개면 프로세스 내부 캐시를 사용하지 않는다.
+    """
+    monkeypatch.setitem(SERVER, 'workers', 3)
+    cache = TTLCache(ttl=60)
+    cache.set('key', 'value')
+    assert cache.get('key') is None
+
+def test_login_after_passwd_changed(api: TestClient):
+    """
+    패스워드 변경 후에는 이전 패스워드로 로그인할 수 없다.
+    """
+    email, passwd = user_info['email'], user_info['passwd']
+    req = {'issue': 'login', 'passwd': passwd, 'email': email}
+    # 로그인 캐시 채우기
+    res = api.post('/api/auth/token', json=req)
+    assert res.status_code == status.HTTP_201_CREATED
+    UserCRUDManager().update(
+        user_id=user_info['id'], name=user_info['name'], passwd='newpasswd0123')
+
+    res = api.post('/api/auth/token', json=req)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    req['passwd'] = 'newpasswd0123'
+    res = api.post('/api/auth/token', json=req)
+    assert res.status_code == status.HTTP_201_CREATED
+
+def test_verify_many():
+    """
+    여러 (패스워드, 해시) 쌍을 입력 순서대로 검증한다.
+    """
+    hashed = [
+        bcrypt.hashpw(passwd, bcrypt.gensalt(rounds=4))
+        for passwd in [b'passwd0', b'passwd1', b'passwd2']
+    ]
+    pairs = [
+        (b'passwd0', hashed[0]),
+        (b'wrong', hashed[1]),
+        (b'passwd2', hashed[2]),
+        (b'passwd0', hashed[2]),
+    ]
+    try:
+        assert AppAuthManager().verify_many(pairs) == \
+            [True, False, True, False]
+        assert AppAuthManager().verify_many([]) == []
+    finally:
+        shutdown_bcrypt_pool()
@@ -1,41 +1,135 @@
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import List, Optional, Sequence, Tuple
+import os
+
 from apps.user.models import User
-from apps.user.utils.managers import UserCRUDManager
+from apps.user.utils.managers import (
+    LOGIN_USER_CACHE,
+    USER_EMAIL_FILTER,
+    UserCRUDManager,
+)
 from architecture.manager.backend_manager import AuthManager
 from architecture.manager.base_manager import FrontendManager
 from core.token_generators import LoginTokenGenerator
+from settings.base import SERVER
 
 import bcrypt
 
+# bcrypt 검증은 CPU를 오래 점유하므로 이벤트 루프 밖에서 수행한다.
+_BCRYPT_POOL: Optional[ProcessPoolExecutor] = None
+_BCRYPT_POOL_SIZE = 1
+_BCRYPT_POOL_LOCK = Lock()
+
+def get_bcrypt_pool() -> ProcessPoolExecutor:
+    """
+    bcrypt 검증용 프로세스 풀 (처음 사용할 때 생성)
+
+    워커 프로세스마다 풀이 생기므로 코어 수를 워커 수로 나눠서 사용한다.
+    """
+    global _BCRYPT_POOL, _BCRYPT_POOL_SIZE
+    with _BCRYPT_POOL_LOCK:
+        if _BCRYPT_POOL is None:
+            _BCRYPT_POOL_SIZE = max(
+                1, (os.cpu_count() or 1) // max(1, SERVER['workers']))
+            _BCRYPT_POOL = ProcessPoolExecutor(max_workers=_BCRYPT_POOL_SIZE)
+        return _BCRYPT_POOL
+
+def shutdown_bcrypt_pool():
+    """
+    서버 종료 시 bcrypt 프로세스 풀 종료
+    """
+    global _BCRYPT_POOL
+    with _BCRYPT_POOL_LOCK:
+        if _BCRYPT_POOL is not None:
+            _BCRYPT_POOL.shutdown()
+            _BCRYPT_POOL = None
+
 class LoginAuthManager(AuthManager):
     token_generator = LoginTokenGenerator
 
 
+def _verify_password(passwd: bytes, user_passwd: bytes) -> bool:
+    """
+    bcrypt 패스워드 검증
+
+    ORM 객체에 의존하지 않으므로 프로세스 풀에서 실행할 수 있다.
+    """
+    return bcrypt.checkpw(passwd, user_passwd)
+
+
+_USERS = UserCRUDManager()
+_LOGIN_AUTH = LoginAuthManager()
+
+
 class AppAuthManager(FrontendManager):
 
-    def login(self, email: str, passwd: str, hashing: bool = True) -> str:
+    def read_login_user(self, email: str) -> Tuple[int, bytes]:
         """
-        아이디 패스워드 검증 및 로그인 토큰 발행
+        로그인 대상 사용자의 (id, 패스워드 해시) 검색
+
+        최근에 검색된 사용자는 캐시에서 가져온다.
         """
-        # 사용자 검색
-        user: User = UserCRUDManager().read(user_email=email)
+        if email not in USER_EMAIL_FILTER:
+            # 확실히 존재하지 않는 사용자
+            raise ValueError('해당 사용자는 존재하지 않습니다.')
+        login_user = LOGIN_USER_CACHE.get(email)
+        if login_user:
+            return login_user
+        user: User = _USERS.read(user_email=email)
         if not user:
             # 사용자 없음
             raise ValueError('해당 사용자는 존재하지 않습니다.')
         user_passwd = user.passwd
-
-        # 문자열이면 utf-8로 인코딩한다.
-        if isinstance(passwd, str):
-            passwd = passwd.encode('utf-8')
+        # 컬럼이 아직 VARCHAR인 DB(LargeBinary 이전)는 문자열을 리턴하므로
+        # utf-8로 인코딩한다.
         if isinstance(user_passwd, str):
             user_passwd = user_passwd.encode('utf-8')
-        
+        login_user = (user.id, user_passwd)
+        LOGIN_USER_CACHE.set(email, login_user)
+        return login_user
+
+    def issue_token(self, email: str, user_id: int) -> str:
+        """
+        검증이 끝난 사용자에 대한 로그인 토큰 발행
+        """
+        return _LOGIN_AUTH.generate_token(
+            req={'email': email, 'user_id': user_id})
+
+    def login_with_user_id(self, email: str, passwd: str) -> Tuple[str, int]:
+        """
+        아이디 패스워드 검증 및 로그인 토큰 발행
+
+        토큰과 함께 사용자 id를 리턴한다.
+        """
+        # 사용자 검색
+        user_id, user_passwd = self.read_login_user(email)
+
         # 패스워드 검토
-        passwd_valid: bool = \
-            bcrypt.checkpw(passwd, user_passwd) if hashing \
-            else passwd == user_passwd
-        if not passwd_valid:
+        if not _verify_password(passwd.encode('utf-8'), user_passwd):
             # 패스워드 틀림
             raise ValueError('패스워드가 정확하지 않습니다.')
-        
+
         # 발급
-        return LoginAuthManager().generate_token(req={'email': email})
+        return self.issue_token(email, user_id), user_id
+
+    def verify_many(self, pairs: Sequence[Tuple[bytes, bytes]]) -> List[bool]:
+        """
+        (패스워드, 해시) 쌍을 한번에 검증
+
+        프로세스 풀에 나눠서 코어 수 만큼 병렬로 처리한다.
+        """
+        if not pairs:
+            return []
+        passwds, user_passwds = zip(*pairs)
+        pool = get_bcrypt_pool()
+        chunksize = max(1, len(pairs) // _BCRYPT_POOL_SIZE)
+        return list(pool.map(
+            _verify_password, passwds, user_passwds, chunksize=chunksize))
+
+    def login(self, email: str, passwd: str) -> str:
+        """
+        아이디 패스워드 검증 및 로그인 토큰 발행
+        """
+        token, _ = self.login_with_user_id(email, passwd)
+        return token
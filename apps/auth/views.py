@@ -1,7 +1,16 @@
+import asyncio
+
+import orjson
 from fastapi import APIRouter, HTTPException, Request, status
 
-from apps.auth.utils.managers import AppAuthManager
-from apps.user.utils.managers import UserCRUDManager
+from apps.auth.utils.managers import (
+    AppAuthManager,
+    _verify_password,
+    get_bcrypt_pool,
+)
+
+# 상태가 없는 매니저이므로 하나만 생성해서 사용한다.
+_AUTH = AppAuthManager()
 
 auth_router = APIRouter(
     prefix='/api/auth',
@@ -19,38 +28,49 @@ class TokenGenerateView:
         status_code=status.HTTP_201_CREATED)
     async def get_token(request: Request):
         try:
-            req = await request.json()
-        except Exception:
+            req = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="요청 데이터가 없습니다.")
-        try:
-            token_issue = req['issue']
-            if token_issue == 'login':
-                # 로그인 토큰 요청
-                email = req['email']
-                passwd = req['passwd']
-                token = AppAuthManager().login(email, passwd)
-                # 데이터 검색
-                user = UserCRUDManager().read(user_email=email)
-                return {
-                    'token': token, 
-                    'user_id': user.id,
-                }
-            else:
-                # 알 수 없는 요청
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail='알 수 없는 요청입니다.')
-        except KeyError:
+        if not isinstance(req, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="요청 데이터가 없습니다.")
+        token_issue = req.get('issue')
+        if token_issue is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail='요청 데이터가 부족합니다.')
+        if token_issue != 'login':
+            # 알 수 없는 요청
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='알 수 없는 요청입니다.')
+
+        # 로그인 토큰 요청
+        email, passwd = req.get('email'), req.get('passwd')
+        if not isinstance(email, str) or not isinstance(passwd, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='요청 데이터가 부족합니다.')
+        try:
+            # 사용자 검색 (id, 패스워드 해시)
+            user_id, user_passwd = _AUTH.read_login_user(email)
+            # 패스워드 검토
+            loop = asyncio.get_running_loop()
+            passwd_valid = await loop.run_in_executor(
+                get_bcrypt_pool(), _verify_password,
+                passwd.encode('utf-8'), user_passwd)
+            if not passwd_valid:
+                raise ValueError('패스워드가 정확하지 않습니다.')
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail='입력한 정보가 맞지 않습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="server errror")
+        # 발급
+        token = _AUTH.issue_token(email, user_id)
+        return {
+            'token': token, 
+            'user_id': user_id,
+        }
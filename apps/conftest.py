@@ -0,0 +1,97 @@
+from typing import Any, Dict
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+# 테스트에서는 bcrypt cost를 최소로 낮춘다. (app import 전에 설정)
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+
+from main import app
+from system.bootloader import Bootloader
+from apps.auth.utils.managers import AppAuthManager
+from apps.user.utils.managers import UserCRUDManager
+
+
+"""
+테스트 모듈에서 공통으로 사용하는 사용자 정보
+다른 사용자가 필요한 경우 테스트 모듈에 USERS_INFO를 정의한다.
+"""
+USERS_INFO: Dict[str, Dict[str, Any]] = {
+    'client': {
+        'email': 'seokbong60@gmail.com',
+        'name': 'jeonhyun',
+        'passwd': 'password0123',
+        'storage_size': 5,
+    },
+    'admin': {
+        'email': 'seokbong61@gmail.com',
+        'name': 'jeonhyun2',
+        'passwd': 'password0123',
+        'storage_size': 5,
+        'is_admin': True,
+    },
+    'other': {
+        'email': 'seokbong62@gmail.com',
+        'name': 'jeonhyun3',
+        'passwd': 'password0123',
+        'storage_size': 5,
+    },
+}
+
+# 테스트용 예시 파일 위치
+EXAMPLE_ROOT = 'apps/storage/tests/example'
+
+def data_url(user_id: int, data_id: int, suffix: str = '') -> str:
+    """
+    데이터 API 주소
+
+    :param suffix: 데이터 하위 API (ex: '/tags', '/shares')
+    """
+    return f'/api/users/{user_id}/datas/{data_id}{suffix}'
+
+@pytest.fixture(scope='session')
+def client() -> TestClient:
+    """
+    전체 테스트에서 하나만 사용하는 TestClient
+    """
+    return TestClient(app)
+
+@pytest.fixture(scope='session')
+def example_files() -> Dict[str, bytes]:
+    """
+    예시 파일 {파일 이름: 내용}
+    전체 테스트에서 한번만 읽는다.
+    """
+    files = dict()
+    for filename in os.listdir(EXAMPLE_ROOT):
+        with open(f'{EXAMPLE_ROOT}/{filename}', 'rb') as f:
+            files[filename] = f.read()
+    return files
+
+@pytest.fixture(scope='module')
+def bootstrapped_app(request, client):
+    """
+    데이터베이스/스토리지 생성 및 사용자 추가
+
+    (TestClient, 사용자 정보, 로그인 토큰)을 리턴한다.
+    각 테스트 모듈이 끝나면 전부 삭제되므로 module 단위로 사용한다.
+    """
+    # Load Application
+    Bootloader.migrate_database()
+    Bootloader.init_storage()
+    # Add Accounts
+    users_info = getattr(request.module, 'USERS_INFO', USERS_INFO)
+    users = {key: dict(info) for key, info in users_info.items()}
+    created = UserCRUDManager().bulk_create(list(users.values()))
+    for info, user in zip(users.values(), created):
+        info['id'] = user.id
+    # 사용자별 로그인 토큰은 한 번만 발급한다.
+    tokens = {
+        key: AppAuthManager().login(info['email'], info['passwd'])
+        for key, info in users.items()
+    }
+    # Return test api
+    yield client, users, tokens
+    # Remove All Data
+    Bootloader.remove_storage()
+    Bootloader.remove_database()
@@ -1,98 +1,68 @@
+import io
 from fastapi import UploadFile, status
 import pytest
 from fastapi.testclient import TestClient
 
 from main import app
-from apps.user.utils.managers import UserCRUDManager
-from system.bootloader import Bootloader
-from apps.auth.utils.managers import AppAuthManager
+from apps.conftest import data_url
 from apps.storage.utils.managers import DataFileCRUDManager
 from apps.data_tag.utils.queries import DataTagQuery
+from apps.tag.models import Tag
+from system.connection.generators import DatabaseGenerator
 
 
 client_info, admin_info, other_info = None, None, None
+tokens = {}
 file_id = 0
-TEST_EXAMLE_ROOT = 'apps/storage/tests/example'
 
 @pytest.fixture(scope='module')
-def api():
+def api(bootstrapped_app, example_files):
     global client_info, admin_info, other_info
+    global tokens
     global file_id
-    # Load Application
-    Bootloader.migrate_database()
-    Bootloader.init_storage()
-    # Add Account
-    client_info = {
-        'email': 'seokbong60@gmail.com',
-        'name': 'jeonhyun',
-        'passwd': 'password0123',
-        'storage_size': 5,
-    }
-    user = UserCRUDManager().create(**client_info)
-    client_info['id'] = user.id
-    # Add Admin Info
-    admin_info = {
-        'email': 'seokbong61@gmail.com',
-        'name': 'jeonhyun2',
-        'passwd': 'password0123',
-        'storage_size': 5,
-        'is_admin': True,
-    }
-    user = UserCRUDManager().create(**admin_info)
-    admin_info['id'] = user.id
-
-    # Add Other Info
-    other_info = {
-        'email': 'seokbong62@gmail.com',
-        'name': 'jeonhyun3',
-        'passwd': 'password0123',
-        'storage_size': 5,
-    }
-    user = UserCRUDManager().create(**other_info)
-    other_info['id'] = user.id
+    api, users, tokens = bootstrapped_app
+    client_info, admin_info, other_info = \
+        users['client'], users['admin'], users['other']
     # Add File
-    hi = open(f'{TEST_EXAMLE_ROOT}/hi.txt', 'rb')
     files = DataFileCRUDManager().create(
         root_id=0,
         user_id=client_info["id"],
-        file=UploadFile(filename=hi.name, file=hi)
+        file=UploadFile(filename='hi.txt', file=io.BytesIO(example_files['hi.txt']))
     )
     file_id = files.id
+    # DataTag.id와 Tag.id가 서로 달라도 태그는 맞게 검색되어야 한다.
+    session = DatabaseGenerator.get_session()
+    session.add(Tag(name='unused'))
+    session.commit()
+    session.close()
     DataTagQuery().create(file_id, ['tag1', 'tag10', 'tag2'])
 
-    yield TestClient(app)
-
-    hi.close()
-    Bootloader.remove_storage()
-    Bootloader.remove_database()
+    yield api
 
 def test_no_token(api: TestClient):
-    res = api.get(f'/api/users/{client_info["id"]}/datas/{file_id}/tags')
+    res = api.get(data_url(client_info["id"], file_id, '/tags'))
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_other_access(api: TestClient):
-    email, passwd = other_info['email'], other_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['other']
     res = api.get(
-        f'/api/users/{client_info["id"]}/datas/{file_id}/tags',
+        data_url(client_info["id"], file_id, '/tags'),
         headers={'token': token}
     )
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_data_not_found(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.get(
-        f'/api/users/{client_info["id"]}/datas/999999/tags',
+        data_url(client_info["id"], 999999, '/tags'),
         headers={'token': token}
     )
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 def test_success(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.get(
-        f'/api/users/{client_info["id"]}/datas/{file_id}/tags',
+        data_url(client_info["id"], file_id, '/tags'),
         headers={'token': token}
     )
     assert res.status_code == status.HTTP_200_OK
@@ -103,3 +73,33 @@ def test_success(api: TestClient):
             {'tag_name': 'tag2'},
         ]
     }
+
+def test_success_after_modify(api: TestClient):
+    # 태그를 수정한 뒤에는 캐시된 태그가 아닌 새 태그를 리턴해야 한다.
+    token = tokens['client']
+    res = api.post(
+        data_url(client_info["id"], file_id, '/tags'),
+        headers={'token': token},
+        json={'tags': ['tag3']}
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+    res = api.get(
+        data_url(client_info["id"], file_id, '/tags'),
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json() == {'tags': [{'tag_name': 'tag3'}]}
+
+def test_removed_data(api: TestClient):
+    # 삭제된 데이터의 태그는 캐시에 남아있지 않아야 한다.
+    token = tokens['client']
+    res = api.delete(
+        data_url(client_info["id"], file_id),
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    res = api.get(
+        data_url(client_info["id"], file_id, '/tags'),
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
@@ -5,6 +5,7 @@ from apps.storage.models import DataInfo
 from apps.tag.models import Tag
 from apps.tag.util.validator import tag_validator
 from architecture.query.crud import QueryCRUD, QueryCreator, QueryReader
+from core.caches import TTLCache
 from core.exc import DataNotFound
 from system.connection.generators import DatabaseGenerator
 
@@ -30,8 +31,8 @@ class DataTagQueryCreator(QueryCreator):
 
         # 기존의 저장된 태그 불러오기
         cur_tags = session.query(DataTag, Tag) \
-            .filter(DataTag.datainfo_id == data_id) \
-            .filter(DataTag.id == Tag.id).all()
+            .join(Tag, Tag.id == DataTag.tag_id) \
+            .filter(DataTag.datainfo_id == data_id).all()
 
         # 기존의 태그 정보 임시저장
         # key: tagname, value (tag id, data_tag id)
@@ -72,12 +73,12 @@ class DataTagQueryCreator(QueryCreator):
         session.commit()
 
         # 태그 데이터 다시 가져오기
-        res = session.query(DataTag, Tag) \
+        res = session.query(Tag) \
+            .join(DataTag, DataTag.tag_id == Tag.id) \
             .filter(DataTag.datainfo_id == data_id) \
-            .filter(DataTag.id == Tag.id) \
             .order_by(Tag.name).all()
 
-        return [tag for _, tag in res]
+        return res
 
 class DataTagQueryReader(QueryReader):
     def __call__(self, data_id: int):
@@ -88,14 +89,17 @@ class DataTagQueryReader(QueryReader):
         if not data_info:
             raise DataNotFound()
         
-        res = session.query(DataTag, Tag) \
+        res = session.query(Tag) \
+            .join(DataTag, DataTag.tag_id == Tag.id) \
             .filter(DataTag.datainfo_id == data_id) \
-            .filter(DataTag.id == Tag.id) \
             .order_by(Tag.name).all()
 
-        return [tag for _, tag in res]
+        return res
 
 
 class DataTagQuery(QueryCRUD):
     creator = DataTagQueryCreator
     reader = DataTagQueryReader
+    # 데이터별 태그 목록 캐시
+    # 워커 프로세스 간에 공유되지 않으므로 TTL을 짧게 잡는다.
+    read_cache = TTLCache(ttl=10)
@@ -78,7 +78,8 @@ class DataSearchManager(FrontendManager):
                 # Root Checking
                 splited = root[:-1].split('/')
                 root_query = ['/'.join(splited[:-1]) + '/', splited[-1]]
-                data_value = DataDBQuery().read(full_root=root_query, is_dir=True)
+                data_value = DataDBQuery().read(
+                    user_id=user_value.id, full_root=root_query, is_dir=True)
                 if not data_value:
                     return []
         # 검색 시작
@@ -117,18 +118,24 @@ class DataSearchManager(FrontendManager):
             query = query.order_by(
                 DataInfo.is_dir.desc(), 
                 DataInfo.created.desc(), 
-                DataInfo.name.asc()
+                DataInfo.name.asc(),
+                DataInfo.id.asc()
             )
         elif sort_name:
             query = query.order_by(
                 DataInfo.is_dir.desc(), 
-                DataInfo.name.asc()
+                DataInfo.name.asc(),
+                DataInfo.id.asc()
             )
         elif sort_create:
             query = query.order_by(
                 DataInfo.is_dir.desc(), 
-                DataInfo.created.desc()
+                DataInfo.created.desc(),
+                DataInfo.id.asc()
             )
+        else:
+            # 인덱스 순서에 영향받지 않도록 생성 순서를 유지한다.
+            query = query.order_by(DataInfo.id.asc())
         records = query.all()
         res = list()
         for data, shared in records:
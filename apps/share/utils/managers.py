@@ -161,13 +161,11 @@ class DataSharedManager(FrontendManager):
 
         # Admin 권한으로 다운받는다.
         admin_user = UserDBQuery().read(is_admin=True)
-        """
-        Admin 패스워드 상태는 bcrypt로 hashing된 상태이므로
-        패스워드 비교시 추가 해싱 필요 X
-        """
+        # 해당 Admin은 DB에서 직접 가져왔으므로 패스워드 검증 없이 발급한다.
         admin_token = AppAuthManager() \
-            .login(admin_user.email, admin_user.passwd, hashing=False)
-        # 실제 다운로드 루트 구하기
-        download_root = \
+            .issue_token(admin_user.email, admin_user.id)
+        # 실제 다운로드 대상 구하기
+        # (파일 루트 또는 디렉토리 zip generator, 데이터 정보)
+        download = \
             DataManager().read(admin_token, data_info.user_id, shared.datainfo_id, 'download')
-        return download_root['file'], data_info.is_dir
\ No newline at end of file
+        return download['file'], download['info']
\ No newline at end of file
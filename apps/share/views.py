@@ -1,9 +1,8 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status, Response
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request, status, Response
 
 from apps.share.utils.managers import DataSharedManager
 from core.exc import DataIsAlreadyShared, DataIsNotShared, DataNotFound, UserNotFound
-from core.background_tasks import background_remove_file
+from core.responses import file_download_response, zip_streaming_response
 
 data_shared_router = APIRouter(
     prefix='/api/users/{user_id}/datas/{data_id}/shares',
@@ -174,13 +173,9 @@ class DataSharedDataDownloadView:
     @data_shared_download_router.get(
         path='/download',
         status_code=status.HTTP_200_OK)
-    def download_shared_data(
-        request: Request, 
-        shared_id: int, 
-        background_tasks: BackgroundTasks
-    ):
+    def download_shared_data(request: Request, shared_id: int):
         try:
-            download_root, is_dir = \
+            download, info = \
                 DataSharedManager().download_shared_data(shared_id)
         except DataIsNotShared:
             raise HTTPException(
@@ -193,11 +188,10 @@ class DataSharedDataDownloadView:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail='server error')
         else:
-            data = FileResponse(download_root)
-            if is_dir:
-                # 디렉토리일 경우 임시파일을 지운다.
-                background_tasks.add_task(background_remove_file, download_root)
-            return data
+            if info['is_dir']:
+                # 디렉토리는 압축하면서 바로 전송한다.
+                return zip_streaming_response(download, info['name'])
+            return file_download_response(download, info['name'])
 
     @staticmethod
     @data_shared_download_router.get(
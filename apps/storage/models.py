@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Boolean, Column, DateTime, ForeignKey, BigInteger,
-    Integer, String, Text, UniqueConstraint
+    Index, Integer, String, UniqueConstraint
 )
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
@@ -9,6 +9,9 @@ from system.connection.generators import DatabaseGenerator
 
 Base = DatabaseGenerator.get_base()
 
+# root 최대 길이
+ROOT_MAX_LENGTH = 1024
+
 class DataInfo(Base):
     __tablename__ = 'datainfo'
     """
@@ -17,9 +20,21 @@ class DataInfo(Base):
         UniqueConstraint('root', 'name', 'is_dir'),
     )
     """
+    __table_args__ = (
+        # 디렉토리 탐색 및 중복 체크 (user_id, root, name, is_dir)
+        # 하위 데이터 검색(root LIKE 'prefix%')도 (user_id, root) 범위로 탄다.
+        # MySQL 인덱스 키 길이 제한으로 root는 prefix만 인덱싱한다.
+        # (prefix 인덱스라 unique는 걸 수 없다.)
+        Index(
+            'ix_datainfo_user_root_name_dir',
+            'user_id', 'root', 'name', 'is_dir',
+            mysql_length={'root': 255}),
+        # 즐겨찾기 검색
+        Index('ix_datainfo_user_favorite', 'user_id', 'is_favorite'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    root = Column(Text(65535), nullable=False)
+    root = Column(String(ROOT_MAX_LENGTH), nullable=False)
     name = Column(String(255), nullable=False)
     is_dir = Column(Boolean, nullable=False)
     created = Column(DateTime(timezone=True), server_default=func.now())
@@ -28,3 +43,6 @@ class DataInfo(Base):
 
     user_id = Column(Integer, ForeignKey('user.id', ondelete='CASCADE', onupdate='CASCADE'))
     user = relationship('User', backref=backref('user', cascade='delete'))
+
+    # INSERT 시 server default(created)도 같이 가져온다.
+    __mapper_args__ = {'eager_defaults': True}
@@ -1,5 +1,13 @@
 from datetime import datetime
 from pydantic import BaseModel, validator
+import re
+
+from apps.storage.models import ROOT_MAX_LENGTH
+
+# 파일/디렉토리 이름에 사용할 수 없는 문자
+_NO_USE_CHARS = re.compile(r'[/\\:*"\'<>|]')
+# 루트에 사용할 수 없는 문자 ('/'는 구분자)
+_NO_USE_ROOT_CHARS = re.compile(r'[\\:*"\'<>|]')
 
 
 class DataInfoBase(BaseModel):
@@ -8,8 +16,7 @@ class DataInfoBase(BaseModel):
 
     @staticmethod
     def _check_filename(s: str):
-        no_uses = {'/', '\\', ':', '*', '"', "'", '<', '>', '|'}
-        return (not s) or (not any([c in s for c in no_uses]))
+        return not _NO_USE_CHARS.search(s)
 
     @validator('name')
     def validate_name(cls, name: str):
@@ -19,13 +26,11 @@ class DataInfoBase(BaseModel):
 
     @validator('root')
     def validate_root(cls, root: str):
-        if root == '/':
-            # 최상위 루트
-            return root
-        units = root.split('/')
-        for unit in units:
-            if not DataInfoBase._check_filename(unit):
-                raise ValueError('폴더 이름이 유효하지 않습니다.')
+        if len(root) > ROOT_MAX_LENGTH:
+            raise ValueError('경로가 너무 깁니다.')
+        if _NO_USE_ROOT_CHARS.search(root):
+            # 구분자('/')로 나뉜 폴더 이름 중 하나라도 유효하지 않음
+            raise ValueError('폴더 이름이 유효하지 않습니다.')
         return root
 
 
@@ -1,3 +1,4 @@
+import io
 import pytest
 import os
 from fastapi.testclient import TestClient
@@ -5,9 +6,7 @@ from fastapi import status
 
 
 from main import app
-from system.bootloader import Bootloader
-from apps.auth.utils.managers import AppAuthManager
-from apps.user.utils.managers import UserCRUDManager
+from apps.conftest import EXAMPLE_ROOT, data_url
 from settings.base import SERVER
 
 from apps.storage.models import DataInfo
@@ -16,124 +15,106 @@ from system.connection.generators import DatabaseGenerator
 
 admin_info = None
 client_info = None
-f1, f2, f3 = None, None, None
+tokens = {}
 created_dirs = dict()
 
 f1_id = None
+examples = {}
 
-TEST_EXAMLE_ROOT = 'apps/storage/tests/example'
-
-@pytest.fixture(scope='module')
-def api():
-    global admin_info
-    global client_info
-    global f1, f2, f3
-    # Load Application
-    Bootloader.migrate_database()
-    Bootloader.init_storage()
-    # Add Admin
-    admin_info = {
+# 관리자와 용량이 작은 사용자
+USERS_INFO = {
+    'admin': {
         'email': 'seokbong60@gmail.com',
         'name': 'jeonhyun',
         'passwd': 'password0123',
         'storage_size': 5,
         'is_admin': True,
-    }
-    user = UserCRUDManager().create(**admin_info)
-    admin_info['id'] = user.id
-    # Add Client
-    client_info = {
+    },
+    'client': {
         'email': 'seokbong61@gmail.com',
         'name': 'jeonghyun2',
         'passwd': 'passwd0123',
         'storage_size': 1,
-    }
-    user = UserCRUDManager().create(**client_info)
-    client_info['id'] = user.id
-    # Open files for testing
-    f1 = open(f'{TEST_EXAMLE_ROOT}/hi.txt', 'rb')
-    f2 = open(f'{TEST_EXAMLE_ROOT}/hi2.txt', 'rb')
-    f3 = open(f'{TEST_EXAMLE_ROOT}/second2.txt', 'rb')
+    },
+}
+
+@pytest.fixture(scope='module')
+def api(bootstrapped_app, example_files):
+    global tokens
+    global admin_info
+    global client_info
+    global examples
+    api, users, tokens = bootstrapped_app
+    examples = example_files
+    admin_info, client_info = users['admin'], users['client']
     # Return test api
-    yield TestClient(app)
-    # Close all files
-    f1.close()
-    f2.close()
-    # Remove All Data
-    Bootloader.remove_storage()
-    Bootloader.remove_database()
-
-
-def reload_file():
-    global f1, f2, f3
-    f1.close()
-    f2.close()
-    f3.close()
-    f1 = open(f'{TEST_EXAMLE_ROOT}/hi.txt', 'rb')
-    f2 = open(f'{TEST_EXAMLE_ROOT}/hi2.txt', 'rb')
-    f3 = open(f'{TEST_EXAMLE_ROOT}/second2.txt', 'rb')
+    yield api
+
+
+def example_file(filename: str, upload_name: str = None):
+    """
+    예시 파일 업로드 데이터
+    매번 새 버퍼를 생성하므로 파일을 다시 열 필요가 없다.
+    """
+    if not upload_name:
+        upload_name = f'{EXAMPLE_ROOT}/{filename}'
+    return (upload_name, io.BytesIO(examples[filename]))
 
 # TESTING COMMON
 def test_no_token(api: TestClient):
     res = api.post(
-        f'/api/users/{admin_info["id"]}/datas/0',
-        files=[('file', (f1.name, f1))]
+        data_url(admin_info["id"], 0),
+        files=[('file', example_file('hi.txt'))]
     )
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_client_try_other_storage(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.post(
-        f'/api/users/{admin_info["id"]}/datas/0',
+        data_url(admin_info["id"], 0),
         json={'dirname': 'mydir'},
         headers={'token': token}
     )
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_request_nothing(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token}
     )
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_admin_try_to_upload_no_user(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     # File
-    reload_file()
     res = api.post(
-        f'/api/users/99999999999/datas/0',
+        data_url(99999999999, 0),
         headers={'token': token},
-        files=[('file', (f1.name, f1)),]
+        files=[('file', example_file('hi.txt')),]
     )
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
     # Directory
     res = api.post(
-        f'/api/users/99999999999/datas/0',
+        data_url(99999999999, 0),
         headers={'token': token},
         json={'dirname': 'mydir'}
     )
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 def test_fileupload_in_no_exists_root(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     # File
-    reload_file()
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/999999999999999999',
+        data_url(client_info["id"], 999999999999999999),
         headers={'token': token},
-        files=[('file', (f1.name, f1)),]
+        files=[('file', example_file('hi.txt')),]
     )
     assert res.status_code == status.HTTP_404_NOT_FOUND
     # Directory
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/999999999999999999',
+        data_url(client_info["id"], 999999999999999999),
         headers={'token': token},
         json={'dirname': 'mydir'}
     )
@@ -141,75 +122,74 @@ def test_fileupload_in_no_exists_root(api: TestClient):
 
 # TESTING DIRECTORY
 def test_directory_validation(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     # / 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'abce/sbc'}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # \ 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'abce\\sbc'}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # : 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'abce:sbc'}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # * 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'abce*sbc'}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # " 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'abce"sbc'}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # ' 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': "bce'sbc"}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # < 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': "bce<sbc"}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # > 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': "bce>sbc"}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # | 사용 금지
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': "bce|sbc"}
     ).status_code == status.HTTP_400_BAD_REQUEST
 
     # 비어있음
     assert api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': ''}
     ).status_code == status.HTTP_400_BAD_REQUEST
@@ -221,12 +201,11 @@ def test_success_directory(api: TestClient):
             `-subdir
             `-mydir
     """
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     # 최상위의 mydir 생성
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'mydir'}
     )
@@ -246,7 +225,7 @@ def test_success_directory(api: TestClient):
 
     # subdir 생성
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/{main_mydir["id"]}',
+        data_url(client_info["id"], main_mydir["id"]),
         headers={'token': token},
         json={'dirname': 'subdir'}
     )
@@ -269,26 +248,23 @@ def test_success_directory(api: TestClient):
 
 def test_failed_upload_file_same_named_directory(api: TestClient):
     # 파일 이름이 기존의 디렉토리 이름과 같으면 생성할 수 없다.
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
-    reload_file()
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
-        files = [('file', ('mydir', f1)),]
+        files = [('file', example_file('hi.txt', 'mydir')),]
     )
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def admin_can_create_to_other_storage(api: TestClient):
     # 관리자는 다른 계정에 디렉토리를 생성할 수 있다.
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     # sub의 mydir 생성
     # 같은 이름의 디렉토리라도 다른 위치면 생성이 가능하다
     main_mydir = created_dirs['mydir']
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/{main_mydir["id"]}',
+        data_url(client_info["id"], main_mydir["id"]),
         headers={'token': token},
         json={'dirname': 'mydir'}
     )
@@ -307,28 +283,38 @@ def admin_can_create_to_other_storage(api: TestClient):
     assert os.path.isdir(f'{SERVER["storage"]}/storage/{client_info["id"]}/root/mydir/mydir')
 
 def test_create_same_directory(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'mydir'}
     )
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
+def test_same_directory_other_user(api: TestClient):
+    """
+    다른 사용자의 같은 이름의 디렉토리와는 충돌하지 않는다.
+    """
+    token = tokens['admin']
+
+    res = api.post(
+        data_url(admin_info["id"], 0),
+        headers={'token': token},
+        json={'dirname': 'mydir'}
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+
 # TESTING FILE
 def test_file_upload(api: TestClient):
     global f1_id
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     # 메인 디렉토리 파일 업로드
-    reload_file()
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
-        files = [('file', (f1.name, f1)),]
+        files = [('file', example_file('hi.txt')),]
     )
     assert res.status_code == status.HTTP_201_CREATED
     output = res.json()
@@ -343,9 +329,9 @@ def test_file_upload(api: TestClient):
     
 
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
-        files = [('file', (f2.name, f2))]
+        files = [('file', example_file('hi2.txt'))]
     )
     assert res.status_code == status.HTTP_201_CREATED
     output = res.json()
@@ -359,13 +345,11 @@ def test_file_upload(api: TestClient):
     }
 
     # 서브 디렉토리 파일 업로드 + 관리자가 특정 클라이언트의 스토리지에 업로드 가능
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
-    reload_file()
+    token = tokens['admin']
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/{created_dirs["mydir"]["id"]}',
+        data_url(client_info["id"], created_dirs["mydir"]["id"]),
         headers={'token': token},
-        files = [('file', (f1.name, f1))]
+        files = [('file', example_file('hi.txt'))]
     )
     assert res.status_code == status.HTTP_201_CREATED
     output = res.json()
@@ -379,9 +363,9 @@ def test_file_upload(api: TestClient):
     }
     
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/{created_dirs["mydir"]["id"]}',
+        data_url(client_info["id"], created_dirs["mydir"]["id"]),
         headers={'token': token},
-        files = [('file', (f2.name, f2))]
+        files = [('file', example_file('hi2.txt'))]
     )
     assert res.status_code == status.HTTP_201_CREATED
     output = res.json()
@@ -401,14 +385,12 @@ def test_file_upload(api: TestClient):
 
 def test_rewrite_file(api: TestClient):
     # 같은 이릉의 파일 업로드일 경우, 덮어쓰기 가능
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     # 메인 디렉토리 파일 업로드
-    reload_file()
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
-        files = [('file', (f1.name, f1))]
+        files = [('file', example_file('hi.txt'))]
     )
     assert res.status_code == status.HTTP_201_CREATED
     # 파일 존재 확인
@@ -417,14 +399,12 @@ def test_rewrite_file(api: TestClient):
 def test_try_create_on_file(api: TestClient):
     # 파일위에 파일/디렉토리를 생성하는 것은 불가능
     # 디렉토리를 못찾은 걸로 간주
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     # Test
-    reload_file()
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/{f1_id}',
+        data_url(client_info["id"], f1_id),
         headers={'token': token},
-        files = [('file', (f1.name, f1))]
+        files = [('file', example_file('hi.txt'))]
     )
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
@@ -439,13 +419,11 @@ def test_usage_limited(api: TestClient):
     session.commit()
     session.refresh(target)
     # 테스트
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
-    reload_file()
+    token = tokens['client']
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
-        files = [('file', (f3.name, f3))]
+        files = [('file', example_file('second2.txt'))]
     )
     assert res.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
     # 원상태
@@ -456,8 +434,7 @@ def test_usage_limited(api: TestClient):
 
 def test_db_no_exists_but_storage_exists(api: TestClient):
     # DB에는 같은 이름의 파일 또는 디렉토리가 없는데 스토리지에는 존재하는 경우
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     # /mydir/hi.txt 삭제
     # f1_id로 테스트: f1_id -> /mydir/hi.txt
     # DB 삭제
@@ -469,7 +446,7 @@ def test_db_no_exists_but_storage_exists(api: TestClient):
     session.commit()
     # Test
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
         json={'dirname': 'mydir'}
     )
@@ -486,13 +463,10 @@ def test_db_no_exists_but_storage_exists(api: TestClient):
 
 def test_failed_over_size_of_file(api: TestClient):
     # 제한 크기 이상의 파일 업로드 불가능 (여기서는 1MB 이상)
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
-    img = open(f'{TEST_EXAMLE_ROOT}/piano.jpg', 'rb')
-    
+    token = tokens['client']
     res = api.post(
-        f'/api/users/{client_info["id"]}/datas/0',
+        data_url(client_info["id"], 0),
         headers={'token': token},
-        files=[('file', (img.name, img)),]
+        files=[('file', example_file('piano.jpg')),]
     )
     assert res.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
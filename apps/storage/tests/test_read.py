@@ -1,25 +1,21 @@
+import io
 import pytest
 import os
 from fastapi.testclient import TestClient
 from fastapi import UploadFile, status
 
-from main import app
-from apps.auth.utils.managers import AppAuthManager
-from apps.user.utils.managers import UserCRUDManager
 from apps.storage.utils.managers import (
     DataFileCRUDManager,
     DataDirectoryCRUDManager,
 )
 from settings.base import SERVER
-from system.bootloader import Bootloader
 
 from apps.storage.models import DataInfo
 from system.connection.generators import DatabaseGenerator
 
 
 client_info, admin_info, other_info = None, None, None
-other_info = None
-hi, hi2 = None, None
+tokens = {}
 treedir = {
     'mydir': {
         'id': None,
@@ -31,25 +27,16 @@ treedir = {
         }
     }
 }
-TEST_EXAMLE_ROOT = 'apps/storage/tests/example'
 
 @pytest.fixture(scope='module')
-def api():
+def api(bootstrapped_app, example_files):
     global client_info, admin_info, other_info
+    global tokens
     global treedir
-    global hi, hi2
-    # Load Application
-    Bootloader.migrate_database()
-    Bootloader.init_storage()
-    # Add Client
-    client_info = {
-        'email': 'seokbong60@gmail.com',
-        'name': 'jeonhyun',
-        'passwd': 'password0123',
-        'storage_size': 5,
-    }
-    user = UserCRUDManager().create(**client_info)
-    client_info['id'] = user.id
+    api, users, tokens = bootstrapped_app
+    client_info, admin_info, other_info = \
+        users['client'], users['admin'], users['other']
+    user_id = client_info['id']
     # Make Directory and files
     """
     mydir
@@ -58,66 +45,37 @@ def api():
         `-subdir
             `-hi.txt
     """
-    hi = open(f'{TEST_EXAMLE_ROOT}/hi.txt', 'rb')
-    hi2 = open(f'{TEST_EXAMLE_ROOT}/hi2.txt', 'rb')
-
     # add directory mydir on root
     mydir = DataDirectoryCRUDManager().create(
         root_id=0,
-        user_id=user.id,
+        user_id=user_id,
         dirname='mydir'
     )
     treedir['mydir']['id'] = mydir.id
     # add hi.txt, hi2.txt on mydir
-    files = []
-    for file in [hi, hi2]:
-        files.append(DataFileCRUDManager().create(
-            root_id=mydir.id, user_id=user.id,
-            file=UploadFile(filename=file.name, file=file)))
+    files = [
+        DataFileCRUDManager().create(
+            root_id=mydir.id, user_id=user_id,
+            file=UploadFile(
+                filename=filename,
+                file=io.BytesIO(example_files[filename])))
+        for filename in ['hi.txt', 'hi2.txt']
+    ]
     treedir['mydir']['hi.txt']['id'] = files[0].id
     treedir['mydir']['hi2.txt']['id'] = files[1].id
     # add subdir on mydir
     subdir = DataDirectoryCRUDManager().create(
-        root_id=mydir.id, user_id=user.id, dirname='subdir')
+        root_id=mydir.id, user_id=user_id, dirname='subdir')
     treedir['mydir']['subdir']['id'] = subdir.id
     # add hi.txt on subdir
-    hi.close()
-    hi = open(f'{TEST_EXAMLE_ROOT}/hi.txt', 'rb')
     files = DataFileCRUDManager().create(
         root_id=subdir.id,
-        user_id=user.id,
-        file=UploadFile(filename=hi.name, file=hi))
+        user_id=user_id,
+        file=UploadFile(
+            filename='hi.txt', file=io.BytesIO(example_files['hi.txt'])))
     treedir['mydir']['subdir']['hi.txt']['id'] = files.id
 
-
-    # Add Admin Info
-    admin_info = {
-        'email': 'seokbong61@gmail.com',
-        'name': 'jeonhyun2',
-        'passwd': 'password0123',
-        'storage_size': 5,
-        'is_admin': True,
-    }
-    user = UserCRUDManager().create(**admin_info)
-    admin_info['id'] = user.id
-
-    # Add Other Info
-    other_info = {
-        'email': 'seokbong62@gmail.com',
-        'name': 'jeonhyun3',
-        'passwd': 'password0123',
-        'storage_size': 5,
-    }
-    user = UserCRUDManager().create(**other_info)
-    other_info['id'] = user.id
-
-    # Return test api
-    yield TestClient(app)
-    # Close all files and remove all data
-    hi.close()
-    hi2.close()
-    Bootloader.remove_storage()
-    Bootloader.remove_database()
+    yield api
 
 def test_omit_param_keys(api: TestClient):
     res = api.get(
@@ -133,8 +91,7 @@ def test_no_token(api: TestClient):
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_other_access_failed(api: TestClient):
-    email, passwd = other_info['email'], other_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['other']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["id"]}',
         headers={'token': token},
@@ -143,8 +100,7 @@ def test_other_access_failed(api: TestClient):
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_no_exists_data(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/999999999999999999',
         headers={'token': token},
@@ -153,8 +109,7 @@ def test_no_exists_data(api: TestClient):
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 def test_user_not_found(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     res = api.get(
         f'/api/users/999999/datas/0',
         headers={'token': token},
@@ -163,8 +118,7 @@ def test_user_not_found(api: TestClient):
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 def test_search_file(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["hi.txt"]["id"]}',
         headers={'token': token},
@@ -180,8 +134,7 @@ def test_search_file(api: TestClient):
     }
 
 def test_search_directory(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["id"]}',
         headers={'token': token},
@@ -197,8 +150,7 @@ def test_search_directory(api: TestClient):
     }
 
 def test_admin_can_search_client_repo(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["id"]}',
         headers={'token': token},
@@ -229,8 +181,7 @@ def test_size_changed_illeagal_in_db(api: TestClient):
     session.close()
 
     # 테스트
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{target_id}',
         headers={'token': token},
@@ -246,8 +197,7 @@ def test_size_changed_illeagal_in_db(api: TestClient):
     }
 
 def test_download_file(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["hi.txt"]["id"]}',
         headers={'token': token},
@@ -255,10 +205,11 @@ def test_download_file(api: TestClient):
     )
     assert res.status_code == status.HTTP_200_OK
     assert res.headers.get('content-type') == 'text/plain; charset=utf-8'
+    assert res.headers.get('content-disposition') == \
+        'attachment; filename="hi.txt"'
 
 def test_download_directory(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     res = api.get(
         f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["id"]}',
@@ -275,8 +226,7 @@ def test_download_directory(api: TestClient):
     """
 
 def test_db_exists_but_no_in_storage(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     # mydir/hi.txt 삭제
     removed_path = \
         f'{SERVER["storage"]}/storage/{client_info["id"]}/root/mydir/hi.txt'
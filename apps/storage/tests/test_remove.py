@@ -14,6 +14,7 @@ from apps.storage.utils.managers import (
 )
 from system.connection.generators import DatabaseGenerator
 from apps.storage.models import DataInfo
+from apps.share.models import DataShared
 
 
 client_info, admin_info, other_info = None, None, None
@@ -166,6 +167,54 @@ def test_success_remove_file(api: TestClient):
         f'{SERVER["storage"]}/storage/{client_info["id"]}/root/mydir/hi.txt'
     )
 
+def test_success_remove_shared_file(api: TestClient):
+    """
+    공유중인 파일 삭제 시 공유 정보도 같이 삭제
+    """
+    email, passwd = client_info['email'], client_info['passwd']
+    token = AppAuthManager().login(email, passwd)
+
+    data_id = treedir['mydir']['hi2.txt']['id']
+    with DatabaseGenerator.get_session() as session:
+        session.add(DataShared(datainfo_id=data_id))
+        session.commit()
+
+    res = api.delete(
+        f'/api/users/{client_info["id"]}/datas/{data_id}',
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    with DatabaseGenerator.get_session() as session:
+        assert session.query(DataShared) \
+            .filter(DataShared.datainfo_id == data_id).count() == 0
+
+def test_remove_directory_wildcard_name(api: TestClient):
+    """
+    이름의 '_'가 다른 디렉토리의 하위 데이터와 매칭되면 안된다.
+    """
+    email, passwd = client_info['email'], client_info['passwd']
+    token = AppAuthManager().login(email, passwd)
+
+    user_id = client_info['id']
+    victim = DataDirectoryCRUDManager().create(
+        root_id=0, user_id=user_id, dirname='a_c')
+    DataDirectoryCRUDManager().create(
+        root_id=victim.id, user_id=user_id, dirname='sub')
+    sibling = DataDirectoryCRUDManager().create(
+        root_id=0, user_id=user_id, dirname='abc')
+    sibling_sub = DataDirectoryCRUDManager().create(
+        root_id=sibling.id, user_id=user_id, dirname='sub')
+
+    res = api.delete(
+        f'/api/users/{user_id}/datas/{victim.id}',
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    with DatabaseGenerator.get_session() as session:
+        assert session.get(DataInfo, sibling_sub.id) is not None
+        assert session.query(DataInfo) \
+            .filter(DataInfo.root == '/a_c/').count() == 0
+
 def test_success_remove_directory(api: TestClient):
     email, passwd = admin_info['email'], admin_info['passwd']
     token = AppAuthManager().login(email, passwd)
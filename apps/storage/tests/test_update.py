@@ -217,6 +217,20 @@ def test_update_to_same_named_file(api: TestClient):
     )
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
+def test_update_to_same_named_file_not_overwritten(api: TestClient):
+    # 같은 이름의 파일이 있는 경우 덮어쓰지 않는다.
+    email, passwd = client_info['email'], client_info['passwd']
+    token = AppAuthManager().login(email, passwd)
+
+    res = api.patch(
+        f'/api/users/{client_info["id"]}/datas/{treedir["mydir"]["hi.txt"]["id"]}',
+        json={'name': 'hi2.txt'},
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert os.path.isfile(
+        f'{SERVER["storage"]}/storage/{client_info["id"]}/root/mydir/hi.txt')
+
 # success testing
 def test_update_filename(api: TestClient):
     email, passwd = client_info['email'], client_info['passwd']
@@ -276,6 +290,34 @@ def test_update_dirname(api: TestClient):
         assert query.filter(DataInfo.root.startswith('/mydir/')).count() == 0
         assert query.filter(DataInfo.root.startswith('/newdir/')).count() == 4
         session.close()
+
+def test_update_dirname_nested_same_name(api: TestClient):
+    """
+    하위에 같은 이름의 디렉토리가 있어도 앞부분의 루트만 바뀌어야 한다.
+    """
+    email, passwd = client_info['email'], client_info['passwd']
+    token = AppAuthManager().login(email, passwd)
+
+    user_id = client_info['id']
+    outer = DataDirectoryCRUDManager().create(
+        root_id=0, user_id=user_id, dirname='same')
+    middle = DataDirectoryCRUDManager().create(
+        root_id=outer.id, user_id=user_id, dirname='x')
+    inner = DataDirectoryCRUDManager().create(
+        root_id=middle.id, user_id=user_id, dirname='same')
+    leaf = DataDirectoryCRUDManager().create(
+        root_id=inner.id, user_id=user_id, dirname='leaf')
+
+    res = api.patch(
+        f'/api/users/{user_id}/datas/{outer.id}',
+        json={'name': 'other'},
+        headers={'token': token}
+    )
+    assert res.status_code == status.HTTP_200_OK
+    with DatabaseGenerator.get_session() as session:
+        assert session.get(DataInfo, inner.id).root == '/other/x/'
+        assert session.get(DataInfo, leaf.id).root == '/other/x/same/'
+
 """
 /mydir -> /newdir로 변경
 /mydir/subdir/hi.txt -> /mydir/subdir/new.txt로 변경
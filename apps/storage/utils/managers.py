@@ -1,8 +1,10 @@
-import shutil
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from fastapi import UploadFile
+from sqlalchemy.orm import Session
+import io
 import os
-import datetime
+import stat
+import zipfile
 
 from apps.storage.models import DataInfo
 from apps.storage.schemas import DataInfoCreate, DataInfoUpdate
@@ -21,20 +23,81 @@ from core.token_generators import (
     LoginTokenGenerator,
     decode_token,
 )
-from core.permissions import (
-    PermissionAdminChecker as AdminOnly,
-    PermissionIssueLoginChecker as LoginedOnly,
-)
-from architecture.query.permission import (
-    PermissionSameUserChecker as OnlyMine,
-)
+from core.permissions import PermissionIssueLoginChecker as LoginedOnly
 from architecture.manager.base_manager import FrontendManager
 from settings.base import SERVER
 
+# 사용자별 스토리지 루트의 공통 prefix
+_STORAGE_ROOT = f'{SERVER["storage"]}/storage'
+
+
+def _user_root(user_id: int) -> str:
+    """
+    사용자의 스토리지 최상위 루트 (끝에 '/' 없음)
+    DataInfo.root가 '/'로 시작하므로 그대로 이어 붙여서 사용한다.
+    """
+    return f'{_STORAGE_ROOT}/{user_id}/root'
+
+
+class _ZipStream(io.RawIOBase):
+    """
+    zipfile이 쓰는 데이터를 모아두는 버퍼
+
+    seek이 불가능한 스트림이므로 zipfile은 앞으로 돌아가지 않고
+    data descriptor를 사용해서 기록한다.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self.size += len(b)
+        return len(b)
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def iter_zip(raw_root: str, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    디렉토리를 zip으로 압축하면서 chunk_size 단위로 리턴하는 generator
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(
+        stream, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True
+    ) as zf:
+        for dirpath, dirnames, filenames in os.walk(raw_root):
+            for dirname in dirnames:
+                # 빈 디렉토리도 포함한다.
+                path = os.path.join(dirpath, dirname)
+                zf.write(path, os.path.relpath(path, raw_root))
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                zinfo = zipfile.ZipInfo.from_file(
+                    path, os.path.relpath(path, raw_root))
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, 'rb') as src, zf.open(zinfo, 'w') as dst:
+                    while chunk := src.read(chunk_size):
+                        dst.write(chunk)
+                        if stream.size >= chunk_size:
+                            yield stream.pop()
+    # 남은 데이터 + central directory
+    yield stream.pop()
+
+
 class DataFileCRUDManager(CRUDManager):
 
     def create(
-        self, root_id: int, user_id: int, file: UploadFile
+        self, root_id: int, user_id: int, file: UploadFile,
+        session: Optional[Session] = None,
     ) -> List[DataInfo]:
         """
         파일 생성
@@ -43,11 +106,12 @@ class DataFileCRUDManager(CRUDManager):
         :param root_id: 파일이 올라갈 디렉토리 아이디
         :param user_id: 사용자 아이디
         :param files: 올라갈 파일 데이터들
+        :param session: 요청 단위로 공유하는 DB 세션 (없으면 쿼리마다 새로 연다)
 
         :return: 생성된 데이터 리스트
         """
         # user 존재 여부 확인
-        user: User = UserDBQuery().read(user_id=user_id)
+        user: User = UserDBQuery().read(user_id=user_id, session=session)
         if not user:
             raise UserNotFound()
         
@@ -57,7 +121,7 @@ class DataFileCRUDManager(CRUDManager):
             # 0이상인 경우만 DB에서 검색한다.
             directory_info: DataInfo =  DataDBQuery().read(
                 user_id=user_id, data_id=root_id, 
-                is_dir=True)
+                is_dir=True, session=session)
             if not directory_info:
                 raise DataNotFound()
             # 상위 디렉토리 절대경로 생성
@@ -65,21 +129,19 @@ class DataFileCRUDManager(CRUDManager):
         
         # 파일 이름 및 절대경로 생성
         filename = file.filename.split('/')[-1]
-        file_root = \
-            f'{SERVER["storage"]}/storage/{user_id}/root{dir_root}{filename}'
+        file_root = f'{_user_root(user_id)}{dir_root}{filename}'
         # 같은 이름의 데이터가 DB에 남아있는지 조사
         db_already_info: DataInfo = DataDBQuery().read(
-            user_id=user_id, full_root=(dir_root, filename))
+            user_id=user_id, full_root=(dir_root, filename),
+            session=session)
         db_already_id = db_already_info.id if db_already_info else 0
         if db_already_id and db_already_info.is_dir:
             # 데이터가 존재하는데 디렉토리면 업로드 불가능
             raise DataAlreadyExists()
         else:
             # 나머지는 업데이트 혹은 생성 가능
-            if DataStorageQuery().read(root=file_root, is_dir=True) or \
-                DataStorageQuery().read(root=file_root, is_dir=False):
-                # 같은 이름의 데이터가 스토리지에 존재하면 삭제
-                DataStorageQuery().destroy(root=file_root)
+            # 같은 이름의 데이터가 스토리지에 존재하면 삭제
+            DataStorageQuery().destroy_if_exists(file_root)
         # Validation 측정 틀리면 ValidationError 발생
         input_format: DataInfoCreate = DataInfoCreate(
             name=filename,
@@ -101,15 +163,16 @@ class DataFileCRUDManager(CRUDManager):
                 data_info = \
                     DataDBQuery().update_file_automatic(
                         data_id=db_already_id,
-                        data_format=input_format)
+                        data_format=input_format,
+                        session=session)
             else:
                 data_info = \
                     DataDBQuery().create(
-                        data_format=input_format)
-        except Exception as e:
+                        data_format=input_format, session=session)
+        except Exception:
             # 실패시 스토리지 루트 삭제
             DataStorageQuery().destroy(root=file_root)
-            raise e
+            raise
         else:
             return data_info
 
@@ -117,54 +180,65 @@ class DataFileCRUDManager(CRUDManager):
         # 다운로드 할 때만 사용
         return raw_root
 
-    def update(self, user_id: int, data_id: int, new_name: str):
+    def update(
+        self, user_id: int, data_id: int, new_name: str,
+        user: Optional[User] = None,
+        data: Optional[DataInfo] = None,
+        session: Optional[Session] = None,
+    ):
+        """
+        파일 이름 수정
+
+        :param user: 이미 검색된 사용자 (없으면 새로 검색)
+        :param data: 이미 검색된 수정 대상 데이터 (없으면 새로 검색)
+        """
         # User 확인
-        user: User = UserDBQuery().read(user_id=user_id)
+        if not user:
+            user = UserDBQuery().read(user_id=user_id, session=session)
         if not user:
             raise UserNotFound()
         # 수정 대상 DataInfo 확인
-        data: DataInfo = \
-            DataDBQuery().read(user_id=user_id, data_id=data_id, is_dir=False)
         if not data:
+            data = DataDBQuery() \
+                .read(user_id=user_id, data_id=data_id, is_dir=False,
+                      session=session)
+        if not data or data.is_dir:
             raise DataNotFound()
         # Validate 측정
         DataInfoUpdate(name=new_name, root=data.root, user_id=user_id)
 
         prev_name = data.name
-        directory_root = f'{SERVER["storage"]}/storage/{user_id}/root{data.root}'
+        directory_root = f'{_user_root(user_id)}{data.root}'
         raw_root = f'{directory_root}{prev_name}'
-        try:
-            # 파일 수정
-            new_root = DataStorageQuery().update(raw_root, new_name)
-        except Exception:
-            """
-            같은 이름의 파일 및 디렉토리가 있는 경우 발생
-            업데이트 불가능
-            """
-            raise DataAlreadyExists()
+        # 파일 수정
+        # 같은 이름의 파일 및 디렉토리가 있는 경우 DataAlreadyExists 발생
+        new_root = DataStorageQuery().update(raw_root, new_name)
         
         if not new_root:
             # 생성 실패: 타겟 데이터가 스토리지에 존재하지 않음
-            DataDBQuery().destroy(data_id)
+            DataDBQuery().destroy(data_id, session=session)
             raise DataNotFound()
         
         try:
             # DB 데이터 수정
             res = DataDBQuery().update(
                 data_id=data.id, 
-                new_name=new_name, user_id=user_id
+                new_name=new_name, user_id=user_id,
+                session=session,
             )
-        except Exception as e:
+        except Exception:
             # DB 데이터 수정에 에러 발생
             # Storage rollback
             DataStorageQuery().update(f'{directory_root}{new_name}', data.name)
-            raise e
+            raise
         return res
 
-    def destroy(self, user_id: int, data_id: int):
-        root, name = DataDBQuery().destroy(data_id)
-        raw_root = \
-            f'{SERVER["storage"]}/storage/{user_id}/root{root}{name}'
+    def destroy(
+        self, user_id: int, data_id: int,
+        session: Optional[Session] = None,
+    ):
+        root, name = DataDBQuery().destroy(data_id, session=session)
+        raw_root = f'{_user_root(user_id)}{root}{name}'
         DataStorageQuery().destroy(root=raw_root)
         
 
@@ -173,9 +247,12 @@ class DataFileCRUDManager(CRUDManager):
 
 class DataDirectoryCRUDManager(CRUDManager):
 
-    def create(self, root_id: int, user_id: int, dirname: str) -> DataInfo:
+    def create(
+        self, root_id: int, user_id: int, dirname: str,
+        session: Optional[Session] = None,
+    ) -> DataInfo:
         # User 존재 여부 확인
-        user: User = UserDBQuery().read(user_id=user_id)
+        user: User = UserDBQuery().read(user_id=user_id, session=session)
         if not user:
             raise UserNotFound()
 
@@ -186,26 +263,25 @@ class DataDirectoryCRUDManager(CRUDManager):
             # 직접 검색
             directory_info: DataInfo =  DataDBQuery().read(
                 user_id=user_id, data_id=root_id, 
-                is_dir=True
+                is_dir=True, session=session
             )
             if not directory_info:
                 raise DataNotFound()
             dir_root = f'{directory_info.root}{directory_info.name}/'
         
         # 새로 생성될 디렉토리 루트 생성
-        root = f'{SERVER["storage"]}/storage/{user_id}/root{dir_root}{dirname}'
+        root = f'{_user_root(user_id)}{dir_root}{dirname}'
         # DB에 같은 데이터가 들어있는 지 확인
         db_already_info: DataInfo = DataDBQuery().read(
-            user_id=user_id, full_root=(dir_root, dirname))
+            user_id=user_id, full_root=(dir_root, dirname),
+            session=session)
         db_already_id = db_already_info.id if db_already_info else 0
 
         if db_already_id:
             # 있는것 자체만으로도 생성 불가능
             raise DataAlreadyExists()
         # DB에 없고 스토리지에 같은 이름의 데이터가 존재하는 경우 강제삭제
-        if DataStorageQuery().read(root=root, is_dir=True) or \
-            DataStorageQuery().read(root=root, is_dir=False):
-            DataStorageQuery().destroy(root=root)
+        DataStorageQuery().destroy_if_exists(root)
         # Validation Check 실패 시 ValidationError
         input_format: DataInfoCreate = DataInfoCreate(
             name=dirname,
@@ -217,68 +293,75 @@ class DataDirectoryCRUDManager(CRUDManager):
         DataStorageQuery().create(root=root, is_dir=True)
         # DB 추가
         try:
-            info: DataInfo = DataDBQuery().create(input_format)
-        except Exception as e:
+            info: DataInfo = DataDBQuery().create(input_format, session=session)
+        except Exception:
             # 실패 시 스토리지에 있는 디렉토리 삭제
             DataStorageQuery().destroy(root=root)
-            raise e
+            raise
         return info
 
-    def update(self, user_id: int, data_id: int, new_name: str):
+    def update(
+        self, user_id: int, data_id: int, new_name: str,
+        user: Optional[User] = None,
+        data: Optional[DataInfo] = None,
+        session: Optional[Session] = None,
+    ):
+        """
+        디렉토리 이름 수정
+
+        :param user: 이미 검색된 사용자 (없으면 새로 검색)
+        :param data: 이미 검색된 수정 대상 데이터 (없으면 새로 검색)
+        """
         # User 확인
-        user: User = UserDBQuery().read(user_id=user_id)
+        if not user:
+            user = UserDBQuery().read(user_id=user_id, session=session)
         if not user:
             raise UserNotFound()
         # DataInfo 확인
-        data: DataInfo = \
-            DataDBQuery().read(user_id=user_id, data_id=data_id)
+        if not data:
+            data = DataDBQuery().read(
+                user_id=user_id, data_id=data_id, session=session)
         if not data:
             raise DataNotFound()
         # Validate 측정
         DataInfoUpdate(name=new_name, root=data.root, user_id=user_id)
 
         prev_name = data.name
-        directory_root = f'{SERVER["storage"]}/storage/{user_id}/root{data.root}'
+        directory_root = f'{_user_root(user_id)}{data.root}'
         raw_root = f'{directory_root}{prev_name}'
-        try:
-            # 디렉토리 수정
-            new_root = DataStorageQuery().update(raw_root, new_name)
-        except Exception:
-            """
-            같은 이름의 파일 및 디렉토리가 있는 경우 발생
-            업데이트 불가능
-            """
-            raise DataAlreadyExists()
+        # 디렉토리 수정
+        # 같은 이름의 파일 및 디렉토리가 있는 경우 DataAlreadyExists 발생
+        new_root = DataStorageQuery().update(raw_root, new_name)
         
         if not new_root:
             # 생성 실패: 타겟 데이터가 스토리지에 존재하지 않음
-            DataDBQuery().destroy(data_id)
+            DataDBQuery().destroy(data_id, session=session)
             raise DataNotFound()
         
         try:
             # DB 데이터 수정
             res = DataDBQuery().update(
-                data_id=data.id, new_name=new_name, user_id=user_id
+                data_id=data.id, new_name=new_name, user_id=user_id,
+                session=session,
             )
-        except Exception as e:
+        except Exception:
             # DB 데이터 수정에 에러 발생
             # Storage 원상태 복구
             DataStorageQuery().update(f'{directory_root}{new_name}', prev_name)
-            raise e
+            raise
         return res
 
-    def read(self, raw_root: str) -> str:
+    def read(self, raw_root: str) -> Iterator[bytes]:
         # 다운로드 할 때만 사용
-
-        # Zip File 생성
-        tmp_name = f'download-{datetime.datetime.now().strftime("%Y%m%d-%H%M%S%f")}'
-        tmp_zip = shutil.make_archive(tmp_name, 'zip', raw_root)
-        return tmp_zip
+        # 임시 zip 파일을 만들지 않고 압축하면서 바로 전송한다.
+        return iter_zip(raw_root)
     
-    def destroy(self, user_id: int, data_id: int):
-        root, name = DataDBQuery().destroy(data_id)
-        raw_root = \
-            f'{SERVER["storage"]}/storage/{user_id}/root{root}{name}'
+    def destroy(
+        self, user_id: int, data_id: int,
+        session: Optional[Session] = None,
+    ):
+        root, name = DataDBQuery().destroy(data_id, session=session)
+        raw_root = f'{_user_root(user_id)}{root}{name}'
         DataStorageQuery().destroy(root=raw_root)
 
     def search(self, *args, **kwargs):
@@ -286,6 +369,17 @@ class DataDirectoryCRUDManager(CRUDManager):
         raise NotImplementedError()
 
 
+def _authorize(issue: str, operator: User, user_id: int) -> bool:
+    """
+    로그인 상태이고 Admin이거나 client and 자기 자신이어야 한다.
+
+    LoginedOnly(issue) & (AdminOnly | (~AdminOnly & OnlyMine))와 같은 결과를
+    checker 객체 생성 없이 계산한다.
+    """
+    return issue == LoginedOnly.ref_v and \
+        (operator.is_admin or operator.id == user_id)
+
+
 class DataManager(FrontendManager):
 
     def create(
@@ -294,7 +388,8 @@ class DataManager(FrontendManager):
         user_id: int,
         data_id: int,
         req_file: Optional[UploadFile] = None,
-        req_dirname: Optional[str] = None
+        req_dirname: Optional[str] = None,
+        session: Optional[Session] = None,
     ) -> DataInfo:
         """
         파일/디렉토리 생성
@@ -304,21 +399,18 @@ class DataManager(FrontendManager):
         :param data_id: 데이터가 올라갈 상위 디렉토리 아이디
         :param request_files: 요청된 파일들
         :param req_dirname: 새로 생성할 디렉토리 이름
+        :param session: 요청 단위로 공유하는 DB 세션
 
         :return: 새로 생성된 데이터의 리스트를 반환
         """
         op_email, issue = decode_token(token, LoginTokenGenerator)
-        operator: User = UserDBQuery().read(user_email=op_email)
+        operator: User = \
+            UserDBQuery().read(user_email=op_email, session=session)
         # 해덩 User가 없으면 Permission Failed
         if not operator:
             raise PermissionError()
         # Admin이거나, client and 자기 자신이어야 한다.
-        if not bool(
-            LoginedOnly(issue) & (
-                AdminOnly(operator.is_admin) | 
-                ((~AdminOnly(operator.is_admin)) & OnlyMine(operator.id, user_id))
-            )
-        ):
+        if not _authorize(issue, operator, user_id):
             raise PermissionError()
 
         if req_file:
@@ -327,63 +419,75 @@ class DataManager(FrontendManager):
                 root_id=data_id,
                 user_id=user_id,
                 file=req_file,
+                session=session,
             )
         elif req_dirname:
             # 디렉토리 생성
             return DataDirectoryCRUDManager().create(
                 root_id=data_id,
                 user_id=user_id,
-                dirname=req_dirname
+                dirname=req_dirname,
+                session=session,
             )
 
     def read(
         self, token: str, 
         user_id: int, 
         data_id: int, 
-        mode: str = 'info'
+        mode: str = 'info',
+        session: Optional[Session] = None,
     ) -> Dict[str, Any]:
         
         op_email, issue = decode_token(token, LoginTokenGenerator)
-        operator: User = UserDBQuery().read(user_email=op_email)
+        operator: User = \
+            UserDBQuery().read(user_email=op_email, session=session)
         # 해당 User 없으면 PermissionError
         if not operator:
             raise PermissionError()
         # Admin이거나, client and 자기 자신이어야 한다
-        if not bool(
-            LoginedOnly(issue) & (
-                AdminOnly(operator.is_admin) | 
-                ((~AdminOnly(operator.is_admin)) & OnlyMine(operator.id, user_id)))):
+        if not _authorize(issue, operator, user_id):
             raise PermissionError()
 
-        if not UserDBQuery().read(user_id=user_id):
+        if operator.id != user_id and \
+            not UserDBQuery().read(user_id=user_id, session=session):
             # user_id에 대한 정보가 존재하는 지 확인
+            # 요청자 본인인 경우 이미 확인됨
             raise UserNotFound()
-        try:
-            # DB에 데이터 검색
-            data_info: DataInfo = \
-                DataDBQuery().read(user_id=user_id, data_id=data_id)
-        except Exception as e:
-            raise e
+        # DB에 데이터 검색
+        data_info: DataInfo = \
+            DataDBQuery().read(
+                user_id=user_id, data_id=data_id, session=session)
         if not data_info:
             # 데이터 없음
             raise DataNotFound()
         # 실제 루트
         raw_root = \
-            f'{SERVER["storage"]}/storage/{user_id}/root{data_info.root}{data_info.name}'
+            f'{_user_root(user_id)}{data_info.root}{data_info.name}'
         # 스토리지 데이터 확인
-        storage_info = \
-            DataStorageQuery().read(
-                root=raw_root, is_dir=data_info.is_dir)
-        if not storage_info:
+        # stat 한번으로 존재 여부, 종류, 크기를 전부 확인한다.
+        storage_stat = DataStorageQuery().stat(raw_root)
+        is_stored = storage_stat is not None and (
+            stat.S_ISDIR(storage_stat.st_mode) if data_info.is_dir
+            else stat.S_ISREG(storage_stat.st_mode))
+        if not is_stored:
             # 실제 스토리지에 존재하지 않음
-            DataDBQuery().destroy(data_info.id)
+            DataDBQuery().destroy(data_info.id, session=session)
             raise DataNotFound()
         
-        if not data_info.is_dir:
+        if not data_info.is_dir and storage_stat.st_size != data_info.size:
             # 읽기 대상 데이터가 파일인 경우
-            # 파일 크기에 대한 동기화를 진행한다.
+            # 실제 크기와 다를 때만 파일 크기에 대한 동기화를 진행한다.
             data_info = DataDBQuery().sync_file_size(
-                data_id=data_id, full_root=raw_root)
+                data_id=data_id, full_root=raw_root,
+                size=storage_stat.st_size, session=session)
+
+        if data_info.is_dir:
+            # 디렉토리는 하위 데이터 개수
+            # 리스트를 만들지 않고 개수만 센다.
+            with os.scandir(raw_root) as entries:
+                size = sum(1 for _ in entries)
+        else:
+            size = data_info.size
 
         # 리턴 데이터
         res = {
@@ -392,14 +496,13 @@ class DataManager(FrontendManager):
                 'root': data_info.root,
                 'is_dir': data_info.is_dir,
                 'name': data_info.name,
-                'size': len(os.listdir(raw_root)) if data_info.is_dir \
-                    else data_info.size
+                'size': size,
             }
         }
 
         if mode == 'download':
             # 다운로드 모드
-            # 다운로드 대상의 파일 주소만 리턴
+            # 파일은 파일 주소, 디렉토리는 zip 데이터 generator를 리턴
             if not data_info.is_dir:
                 res['file'] = DataFileCRUDManager().read(raw_root)
             else:
@@ -407,76 +510,72 @@ class DataManager(FrontendManager):
         return res
     
     def update(
-        self, token: str, user_id: int, data_id: int, new_name: str
+        self, token: str, user_id: int, data_id: int, new_name: str,
+        session: Optional[Session] = None,
     ) -> Dict[str, Any]:
         
         # email에 대한 요청 사용자 구하기
         op_email, issue = decode_token(token, LoginTokenGenerator)
-        operator: Optional[User] = UserDBQuery().read(user_email=op_email)
+        operator: Optional[User] = \
+            UserDBQuery().read(user_email=op_email, session=session)
         if not operator:
             raise PermissionError()
 
         # Admin이거나 client and 자기 자신이어야 한다
-        if not bool(
-            LoginedOnly(issue) & (
-                AdminOnly(operator.is_admin) | 
-                ((~AdminOnly(operator.is_admin)) & OnlyMine(operator.id, user_id))
-            )
-        ):
+        if not _authorize(issue, operator, user_id):
             raise PermissionError()
         
-        try:
-            # 데이터 검색
-            target: Optional[DataInfo] = \
-                DataDBQuery().read(user_id=user_id, data_id=data_id)
-            if not target:
-                # 데이터 없음
-                raise DataNotFound()
-            if target.is_dir:
-                # 디렉토리
-                res = DataDirectoryCRUDManager() \
-                    .update(user_id, data_id, new_name)
-            else:
-                # 파일
-                res = DataFileCRUDManager() \
-                    .update(user_id, data_id, new_name)
-        except Exception as e:
-            raise e
+        # 데이터 검색
+        target: Optional[DataInfo] = \
+            DataDBQuery().read(
+                user_id=user_id, data_id=data_id, session=session)
+        if not target:
+            # 데이터 없음
+            raise DataNotFound()
+        # 요청자 본인이면 사용자를 다시 검색하지 않는다.
+        user = operator if operator.id == user_id else None
+        if target.is_dir:
+            # 디렉토리
+            res = DataDirectoryCRUDManager() \
+                .update(user_id, data_id, new_name,
+                        user=user, data=target, session=session)
         else:
-            return {
-                'created': res.created,
-                'data_id': res.id,
-                'root': res.root,
-                'name': res.name,
-                'is_dir': res.is_dir,
-            }
+            # 파일
+            res = DataFileCRUDManager() \
+                .update(user_id, data_id, new_name,
+                        user=user, data=target, session=session)
+        return {
+            'created': res.created,
+            'data_id': res.id,
+            'root': res.root,
+            'name': res.name,
+            'is_dir': res.is_dir,
+        }
 
-    def destroy(self, token: str, user_id: int, data_id: int):
+    def destroy(
+        self, token: str, user_id: int, data_id: int,
+        session: Optional[Session] = None,
+    ):
         # email에 대한 요청 사용자 구하기
         op_email, issue = decode_token(token, LoginTokenGenerator)
         operator: Optional[User] = \
-            UserDBQuery().read(user_email=op_email)
+            UserDBQuery().read(user_email=op_email, session=session)
         if not operator:
             raise PermissionError()
 
         # Admin이거나 client and 자기 자신이어야 한다
-        if not bool(
-            LoginedOnly(issue) & (
-                AdminOnly(operator.is_admin) | 
-                ((~AdminOnly(operator.is_admin)) & OnlyMine(operator.id, user_id))
-            )
-        ):
+        if not _authorize(issue, operator, user_id):
             raise PermissionError()
 
-        try:
-            # 검색
-            target: Optional[DataInfo] = \
-                DataDBQuery().read(user_id=user_id, data_id=data_id)
-            if not target:
-                raise DataNotFound()
-            elif target.is_dir:
-                DataDirectoryCRUDManager().destroy(user_id, data_id)
-            else:
-                DataFileCRUDManager().destroy(user_id, data_id)
-        except Exception as e:
-            raise e
+        # 검색
+        target: Optional[DataInfo] = \
+            DataDBQuery().read(
+                user_id=user_id, data_id=data_id, session=session)
+        if not target:
+            raise DataNotFound()
+        elif target.is_dir:
+            DataDirectoryCRUDManager() \
+                .destroy(user_id, data_id, session=session)
+        else:
+            DataFileCRUDManager() \
+                .destroy(user_id, data_id, session=session)
@@ -1,9 +1,12 @@
-from sqlalchemy import and_, Sequence, func
+from sqlalchemy import and_, exists, literal, or_, select, Sequence, func
+from sqlalchemy.orm import Session
 from typing import Optional
 import os
 
 from apps.storage.models import DataInfo
 from apps.data_tag.models import DataTag
+from apps.data_tag.utils.queries import DataTagQuery
+from apps.share.models import DataShared
 from apps.tag.models import Tag
 from apps.storage.schemas import DataInfoCreate
 from architecture.query.crud import (
@@ -17,10 +20,16 @@ from core.exc import DataAlreadyExists, DataNotFound
 from system.connection.generators import DatabaseGenerator
 
 class DataDBQueryCreator(QueryCreator):
-    def __call__(self, data_format: DataInfoCreate) -> DataInfo:
+    def __call__(
+        self,
+        data_format: DataInfoCreate,
+        session: Optional[Session] = None,
+    ) -> DataInfo:
 
-        session = DatabaseGenerator.get_session()
-        q = session.query(DataInfo)
+        # 주입된 세션이 없는 경우에만 직접 열고 닫는다.
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
 
         data: DataInfo = DataInfo(
             name=data_format.name,
@@ -29,74 +38,80 @@ class DataDBQueryCreator(QueryCreator):
             is_dir=data_format.is_dir,
             size=data_format.size,
         )
-        # user_id & name & root & is_dir일 경우 생성 불가능
-        if q.filter(and_(
-            DataInfo.name == data.name,
-            DataInfo.root == data.root,
-            DataInfo.user_id == data.user_id,
-            DataInfo.is_dir == data.is_dir
-        )).scalar():
-            raise DataAlreadyExists()
-        
         try:
+            # user_id & name & root & is_dir일 경우 생성 불가능
+            # row를 가져오지 않고 존재 여부만 확인한다.
+            if session.query(exists().where(and_(
+                DataInfo.name == data.name,
+                DataInfo.root == data.root,
+                DataInfo.user_id == data.user_id,
+                DataInfo.is_dir == data.is_dir
+            ))).scalar():
+                raise DataAlreadyExists()
             # DB 업로드
             session.add(data)
             session.commit()
-            session.refresh(data)
         except Exception as e:
             session.rollback()
             raise e
         else:
             return data
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class DataDBQueryDestroyer(QueryDestroyer):
-    def __call__(self, data_id: int) -> Optional[DataInfo]:
-        session = DatabaseGenerator.get_session()
+    def __call__(
+        self,
+        data_id: int,
+        session: Optional[Session] = None,
+    ) -> Optional[DataInfo]:
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(DataInfo)
         
-        data: DataInfo = q.filter(DataInfo.id == data_id).scalar()
+        data: DataInfo = session.get(DataInfo, data_id)
         root, name = data.root, data.name
         try:
+            # 삭제 대상: 자기 자신 + 디렉토리인 경우 하위 데이터 전부
+            victim_filter = DataInfo.id == data_id
             if data.is_dir:
-                # 디렉토리
-                # 하위 디렉토리 태그 전부 삭제
-                infos = session.query(DataInfo, DataTag, Tag) \
-                    .filter(and_(
-                        DataInfo.user_id == data.user_id,
-                        DataInfo.root.startswith(f'{data.root}{data.name}/')
-                    )) \
-                    .filter(and_(
-                        DataTag.datainfo_id == DataInfo.id,
-                        Tag.id == DataTag.id,
-                    )).all()
-                for _, _, tag in infos:
-                    session.delete(tag)
-
-                # 하위 데이터 전부 삭제
-                q.filter(and_(
+                victim_filter = or_(victim_filter, and_(
                     DataInfo.user_id == data.user_id,
-                    DataInfo.root.startswith(f'{data.root}{data.name}/')
-                )).delete(synchronize_session='fetch')
-            
-            # 디렉토리/파일 전부 해당되는 내용 -> 자기 자신과 태그 삭제
-            infos = session.query(DataTag, Tag).filter(and_(
-                    DataTag.datainfo_id == data_id,
-                    Tag.id == DataTag.tag_id,
-            )).all()
-            for _, tag in infos:
-                session.delete(tag)
-            # 파일
-            q.filter(DataInfo.id == data_id).delete()
+                    # 이름의 %, _ 는 와일드카드가 아닌 문자 그대로 비교한다.
+                    DataInfo.root.startswith(
+                        f'{data.root}{data.name}/', autoescape=True)
+                ))
+            victim_ids = select(DataInfo.id).where(victim_filter)
+            # 태그는 루프 없이 한번에 삭제
+            session.query(Tag).filter(Tag.id.in_(
+                select(DataTag.tag_id)
+                    .where(DataTag.datainfo_id.in_(victim_ids))
+            )).delete(synchronize_session=False)
+            session.query(DataTag) \
+                .filter(DataTag.datainfo_id.in_(victim_ids)) \
+                .delete(synchronize_session=False)
+            # 공유 정보도 bulk delete에는 ORM cascade가 적용되지 않는다.
+            session.query(DataShared) \
+                .filter(DataShared.datainfo_id.in_(victim_ids)) \
+                .delete(synchronize_session=False)
+            # 데이터 삭제
+            # 삭제된 row를 다시 SELECT 하지 않도록 identity map은 건드리지 않고
+            # 불러온 대상만 세션에서 뺀다.
+            q.filter(victim_filter).delete(synchronize_session=False)
+            session.expunge(data)
             session.commit()
         except Exception as e:
             session.rollback()
             raise e
         else:
+            # 삭제된 데이터의 태그 캐시 제거
+            DataTagQuery.invalidate()
             return root, name
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class DataDBQueryReader(QueryReader):
     def __call__(
@@ -104,22 +119,26 @@ class DataDBQueryReader(QueryReader):
         user_id: Optional[int] = None,
         is_dir: Optional[bool] = None,
         data_id: Optional[int] = None,
-        full_root: Optional[Sequence[str]] = None
+        full_root: Optional[Sequence[str]] = None,
+        session: Optional[Session] = None,
     ) -> DataInfo:
         """
         is_dir이 설정된 경우 is_dir에 따른 데이터 검색
         None이면 is_dir 여부 관계없이 검색
         """
-        session = DatabaseGenerator.get_session()
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(DataInfo)
         data = None
         try:
             if data_id:
                 # search by data_id
-                query = q.filter(DataInfo.id == data_id)
-                if user_id:
-                    query.filter(DataInfo.user_id == user_id)
-                data: DataInfo = query.scalar()
+                # primary key 검색은 identity map을 먼저 확인한다.
+                data: DataInfo = session.get(DataInfo, data_id)
+                if data and user_id and data.user_id != user_id:
+                    # 다른 사용자의 데이터
+                    data = None
 
             elif full_root:
                 # search by full_root
@@ -128,13 +147,15 @@ class DataDBQueryReader(QueryReader):
                     DataInfo.name == full_root[1],
                 ))
                 if user_id:
-                    query.filter(DataInfo.user_id == user_id)
+                    query = query.filter(DataInfo.user_id == user_id)
+                if is_dir is not None:
+                    query = query.filter(DataInfo.is_dir == is_dir)
                 data = query.scalar()
         except Exception as e:
             session.rollback()
             raise e
         else:
-            if is_dir:
+            if is_dir is not None:
                 """
                 is_dir이 설정된 경우
                 is_dir까지 체크한다.
@@ -143,22 +164,23 @@ class DataDBQueryReader(QueryReader):
                     return None
             return data
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class DataDBQueryUpdator(QueryUpdator):
     def __call__(
         self, new_name: str,
         user_id: int,
         data_id: int,
+        session: Optional[Session] = None,
     ) -> DataInfo:
-        session = DatabaseGenerator.get_session()
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(DataInfo)
         # 아이디로 찾는 경우
-        data_info = q.filter(and_(
-            DataInfo.user_id == user_id,
-            DataInfo.id == data_id,
-        )).scalar()
-        if not data_info:
+        data_info: DataInfo = session.get(DataInfo, data_id)
+        if not data_info or data_info.user_id != user_id:
             # 그래도 못찾음
             raise DataNotFound()
         try:
@@ -171,10 +193,12 @@ class DataDBQueryUpdator(QueryUpdator):
                 src_root = data_info.root + new_name + '/'
                 q.filter(and_(
                     DataInfo.user_id == user_id,
-                    DataInfo.root.startswith(dst_root),
+                    DataInfo.root.startswith(dst_root, autoescape=True),
                 )).update({
-                    DataInfo.root: func.replace(
-                        DataInfo.root, dst_root, src_root)
+                    # 앞부분(prefix)만 교체한다.
+                    # replace는 중간에 같은 이름의 경로가 있으면 그것까지 바꾼다.
+                    DataInfo.root: literal(src_root) + func.substr(
+                        DataInfo.root, len(dst_root) + 1)
                 }, synchronize_session=False)
             session.commit()
             session.refresh(data_info)
@@ -184,7 +208,8 @@ class DataDBQueryUpdator(QueryUpdator):
         else:
             return data_info
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class DataDBQuery(QueryCRUD):
     creator = DataDBQueryCreator
@@ -195,13 +220,14 @@ class DataDBQuery(QueryCRUD):
     def update_file_automatic(
         self, 
         data_id: int, 
-        data_format: DataInfoCreate
+        data_format: DataInfoCreate,
+        session: Optional[Session] = None,
     ) -> DataInfo:
         # 데이터를 생성할 때, 같은 이름의 파일을 자동 갱신할 때 사용한다.
-        session = DatabaseGenerator.get_session()
-        q = session.query(DataInfo)
-        # 같은 유저 + 같은 이름 + 같은 루트
-        data_info: DataInfo = q.filter(DataInfo.id == data_id).scalar()
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
+        data_info: DataInfo = session.get(DataInfo, data_id)
         if not data_info:
             raise DataNotFound()
         try:
@@ -209,34 +235,44 @@ class DataDBQuery(QueryCRUD):
             # 싸이즈만 변경하면 된다.
             data_info.size = data_format.size
             session.commit()
-            session.refresh(data_info)
         except Exception as e:
             session.rollback()
             raise e
         else:
             return data_info
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
-    def sync_file_size(self, data_id: int, full_root: str) -> DataInfo:
+    def sync_file_size(
+        self,
+        data_id: int,
+        full_root: str,
+        size: Optional[int] = None,
+        session: Optional[Session] = None,
+    ) -> DataInfo:
         # 해당 데이터와 실제 데이터의 크기를 동기화
-        session = DatabaseGenerator.get_session()
-        q = session.query(DataInfo)
-        data_info: DataInfo = q.filter(DataInfo.id == data_id).scalar()
+        # size: 이미 구한 실제 크기 (없으면 직접 구한다)
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
+        data_info: DataInfo = session.get(DataInfo, data_id)
         if not data_info:
             raise DataNotFound()
         try:
             # 비교 후 수정
-            real_size, db_size = os.path.getsize(full_root), data_info.size
+            real_size = size if size is not None \
+                else os.path.getsize(full_root)
+            db_size = data_info.size
             if real_size != db_size:
                 data_info.size = real_size
                 session.commit()
-                session.refresh(data_info)
         except Exception as e:
             session.rollback()
             raise e
         else:
             return data_info
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
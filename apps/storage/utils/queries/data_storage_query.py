@@ -11,7 +11,7 @@ from architecture.query.crud import (
     QueryReader,
     QueryUpdator
 )
-from core.exc import UsageLimited
+from core.exc import DataAlreadyExists, UsageLimited
 
 
 class DataStorageQueryCreator(QueryCreator):
@@ -41,24 +41,18 @@ class DataStorageQueryCreator(QueryCreator):
                 # rewrite를 하지 않는 경우
                 assert os.path.isfile(root) is False
             
-            segment_size = 1000 # 1000바이트씩 끊어서
-            data_len = 0 # 데이터 길이
+            segment_size = 1 << 20 # 1MiB씩 끊어서
             with open(root, 'wb') as f:
-                while s := file.file.read(segment_size):
-                    f.write(s)
-                    data_len += len(s)
+                shutil.copyfileobj(file.file, f, segment_size)
+                data_len = f.tell() # 데이터 길이
             # 데이터 크기 비교
-            try:
-                usage_data = UserDBQuery().read_usage(user_id)
-                entire, used = usage_data['entire'], usage_data['used']
-                if used + data_len > entire:
-                    # 메모리 초과, 데이터 삭제 후 Exception
-                    os.remove(root)
-                    raise UsageLimited()
-            except Exception as e:
-                raise e
-            else:
-                return data_len
+            usage_data = UserDBQuery().read_usage(user_id)
+            entire, used = usage_data['entire'], usage_data['used']
+            if used + data_len > entire:
+                # 메모리 초과, 데이터 삭제 후 Exception
+                os.remove(root)
+                raise UsageLimited()
+            return data_len
 
 class DataStorageQueryReader(QueryReader):
     def __call__(self, root: str, is_dir: bool) -> Optional[Dict]:
@@ -102,11 +96,20 @@ class DataStorageQueryDestroyer(QueryDestroyer):
 
 class DataStorageQueryUpdator(QueryUpdator):
     def __call__(self, root: str, new_name: str) -> Optional[str]:
+        """
+        파일 또는 디렉토리 이름 변경
+        같은 이름의 데이터가 이미 존재하는 경우 DataAlreadyExists 호출
+
+        :return: 변경된 루트, 대상 데이터가 없으면 None
+        """
         if (os.path.isfile(root) or os.path.isdir(root)):
             root_list = root.split('/')
             root_list[-1] = new_name
             new_root = '/'.join(root_list)
-            os.rename(root, new_root)   # 같은 이름이 존재할 경우 에러 발생
+            if new_root != root and os.path.lexists(new_root):
+                # os.rename은 같은 이름의 파일을 그대로 덮어쓰므로 먼저 확인한다.
+                raise DataAlreadyExists()
+            os.rename(root, new_root)
             return new_root
         else:
             return None
@@ -116,3 +119,22 @@ class DataStorageQuery(QueryCRUD):
     destroyer = DataStorageQueryDestroyer
     reader =  DataStorageQueryReader
     updator = DataStorageQueryUpdator
+
+    def stat(self, root: str) -> Optional[os.stat_result]:
+        # 존재 여부, 종류, 크기를 stat 한번으로 확인 (없으면 None)
+        try:
+            return os.stat(root)
+        except FileNotFoundError:
+            return None
+
+    def destroy_if_exists(self, root: str):
+        # 확인 없이 바로 삭제를 시도하고, 없으면 무시한다.
+        try:
+            os.unlink(root)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # 디렉토리인 경우 (Linux는 EISDIR, macOS는 EPERM)
+            if not os.path.isdir(root):
+                raise
+            shutil.rmtree(root)
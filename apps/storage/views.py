@@ -2,7 +2,7 @@ import json
 from typing import Optional
 from fastapi import (
     APIRouter, 
-    BackgroundTasks, 
+    Depends,
     HTTPException, 
     Request, 
     Response, 
@@ -10,12 +10,14 @@ from fastapi import (
     status
 )
 import pydantic
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 
 from apps.storage.schemas import DataInfoRead
 from apps.storage.utils.managers import DataManager
 from core.exc import DataAlreadyExists, DataNotFound, UsageLimited, UserNotFound
-from core.background_tasks import background_remove_file
+from core.responses import file_download_response, zip_streaming_response
+from core.dependencies import db_session
 
 storage_router = APIRouter(
     prefix='/api/users/{user_id}/datas/{data_id}',
@@ -41,6 +43,7 @@ class StorageView:
         user_id: int, 
         data_id: int,
         file: Optional[UploadFile] = None,
+        db: Session = Depends(db_session),
     ):
         """
         파일/디렉토리 생성 API
@@ -91,9 +94,12 @@ class StorageView:
 
         try:
             # 파일 업로드 또는 디렉토리 생성
-            created_datas = DataManager().create(
+            # 파일/DB 작업이 이벤트 루프를 막지 않도록 스레드에서 처리
+            created_datas = await run_in_threadpool(
+                DataManager().create,
                 token, user_id,
-                data_id, file, dirname
+                data_id, file, dirname,
+                session=db,
             )
         except UsageLimited:
             raise HTTPException(
@@ -104,7 +110,7 @@ class StorageView:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='접근 권한이 없습니다.')
         except pydantic.ValidationError as e:
-            msg = str(e.args[0][0].exc)
+            msg = e.errors()[0]['msg']
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=msg)
@@ -142,7 +148,7 @@ class StorageView:
         user_id: int, 
         data_id: int, 
         method: str,
-        background_tasks: BackgroundTasks,
+        db: Session = Depends(db_session),
     ):
 
         if method not in ('info', 'download'):
@@ -165,7 +171,9 @@ class StorageView:
 
         try:
             # 정보 검색
-            data = DataManager().read(token, user_id, data_id, method)
+            data = await run_in_threadpool(
+                DataManager().read,
+                token, user_id, data_id, method, session=db)
         except PermissionError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -189,21 +197,21 @@ class StorageView:
 
         if method == 'info':
             return data['info']
+        elif data['info']['is_dir']:
+            # 디렉토리는 압축하면서 바로 전송한다.
+            return zip_streaming_response(data['file'], data['info']['name'])
         else:
             # 파일 다운로드
-            download_root = data['file']
-            data['file'] = FileResponse(download_root)
-            
-            # 디렉토리일 경우에는 임시파일을 후에 지운다
-            if data['info']['is_dir']:
-                background_tasks.add_task(background_remove_file, download_root)
-            return data['file']
+            return file_download_response(data['file'], data['info']['name'])
 
     @staticmethod
     @storage_router.patch(
         path='',
         status_code=status.HTTP_200_OK)
-    async def update_data_info(request: Request, user_id: int, data_id: int):
+    async def update_data_info(
+        request: Request, user_id: int, data_id: int,
+        db: Session = Depends(db_session),
+    ):
         try:
             # 토큰 가져오기
             token = request.headers['token']
@@ -231,13 +239,15 @@ class StorageView:
 
         try:
             # 데이터 업데이트
-            res = DataManager().update(token, user_id, data_id, new_name)
+            res = await run_in_threadpool(
+                DataManager().update,
+                token, user_id, data_id, new_name, session=db)
         except PermissionError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail='접근 권한이 없습니다.')
         except pydantic.ValidationError as e:
-            msg = str(e.args[0][0].exc)
+            msg = e.errors()[0]['msg']
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=msg)
@@ -265,7 +275,10 @@ class StorageView:
     @storage_router.delete(
         path='',
         status_code=status.HTTP_204_NO_CONTENT)
-    async def remove_data_info(request: Request, user_id: int, data_id: int):
+    async def remove_data_info(
+        request: Request, user_id: int, data_id: int,
+        db: Session = Depends(db_session),
+    ):
         try:
             # 토큰 가져오기
             token = request.headers['token']
@@ -279,7 +292,9 @@ class StorageView:
                 detail='server error')
 
         try:
-            DataManager().destroy(token, user_id, data_id)
+            await run_in_threadpool(
+                DataManager().destroy,
+                token, user_id, data_id, session=db)
         except PermissionError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
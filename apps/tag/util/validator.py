@@ -1,6 +1,9 @@
+import re
+
+# 태그에 사용할 수 없는 문자
+_NO_USE_CHARS = re.compile(r'[/\\:*"\'<>|,]')
 
 def tag_validator(tag: str):
 	if not isinstance(tag, str) or not (0 < len(tag) <= 32):
 		return False
-	no_uses = {'/', '\\', ':', '*', '"', "'", '<', '>', '|', ','}
-	return (not tag) or (not any([c in tag for c in no_uses]))
+	return not _NO_USE_CHARS.search(tag)
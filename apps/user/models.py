@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, LargeBinary, String, DateTime, Boolean
 from sqlalchemy.sql import func
 
 from system.connection.generators import DatabaseGenerator
@@ -12,6 +12,9 @@ class User(Base):
     email = Column(String(128), unique=True, nullable=False)
     name = Column(String(32), unique=True, nullable=False)
     storage_size = Column(Integer, nullable=False)
-    passwd = Column(String(255), nullable=False)
+    passwd = Column(LargeBinary(60), nullable=False)  # bcrypt hash
     is_admin = Column(Boolean, nullable=False, default=False)
     created = Column(DateTime(timezone=True), server_default=func.now())
+
+    # INSERT 시 server default(created)도 같이 가져온다.
+    __mapper_args__ = {'eager_defaults': True}
@@ -3,43 +3,36 @@ import os
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from main import app
-from system.bootloader import Bootloader
-from apps.auth.utils.managers import AppAuthManager
-from apps.user.utils.managers import UserCRUDManager
+from settings.base import SERVER
 
 admin_info = None
 client_info = None
-
-@pytest.fixture(scope='module')
-def api():
-    global admin_info
-    global client_info
-    # Load Application
-    Bootloader.migrate_database()
-    Bootloader.init_storage()
-    # Add Admin
-    admin_info = {
+tokens = {}
+USERS_INFO = {
+    'admin': {
         'email': 'seokbong60@gmail.com',
         'name': 'jeonhyun',
         'passwd': 'password0123',
         'storage_size': 5,
         'is_admin': True,
-    }
-    UserCRUDManager().create(**admin_info)
-    # Add Client
-    client_info = {
+    },
+    'client': {
         'email': 'seokbong61@gmail.com',
         'name': 'jeonghyun2',
         'passwd': 'passwd0123',
         'storage_size': 10,
-    }
-    UserCRUDManager().create(**client_info)
+    },
+}
+
+@pytest.fixture(scope='module')
+def api(bootstrapped_app):
+    global admin_info
+    global client_info
+    global tokens
+    api, users, tokens = bootstrapped_app
+    admin_info, client_info = users['admin'], users['client']
     # Return test api
-    yield TestClient(app)
-    # Remove All Of Data
-    Bootloader.remove_storage()
-    Bootloader.remove_database()
+    yield api
 
 def test_no_login(api: TestClient):
     req = {
@@ -49,18 +42,16 @@ def test_no_login(api: TestClient):
         'storage_size': 4,
     }
     res = api.post('/api/users', json=req)
-    res.status_code = status.HTTP_401_UNAUTHORIZED
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_all_omit_req_data(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     res = api.post('/api/users', headers={'token': token})
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_some_omit_req_data(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     req = {
         'email': 'themail@gmail.com',
@@ -71,8 +62,7 @@ def test_some_omit_req_data(api: TestClient):
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_no_admin(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
 
     req = {
         'email': 'themail@gmail.com',
@@ -90,8 +80,7 @@ def test_failed_token_is_no_login_issue(api: TestClient):
 """
 
 def test_email_validation(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     req = {
         'email': 'themail.gmail.com',
@@ -103,8 +92,7 @@ def test_email_validation(api: TestClient):
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_name_validation(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     req = {
         'email': 'themail@gmail.com',
@@ -124,8 +112,7 @@ def test_name_validation(api: TestClient):
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_passwd_validation(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     req = {
         'email': 'themail@gmail.com',
@@ -141,8 +128,7 @@ def test_passwd_validation(api: TestClient):
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_storage_size_validation(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     req = {
         'email': 'themail@gmail.com',
@@ -154,8 +140,7 @@ def test_storage_size_validation(api: TestClient):
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_upload_same_data(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     req = {
         'email': client_info['email'],
@@ -176,8 +161,7 @@ def test_upload_same_data(api: TestClient):
     assert res.status_code == status.HTTP_400_BAD_REQUEST
 
 def test_success(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     
     req = {
         'email': 'themail@gmail.com',
@@ -189,7 +173,6 @@ def test_success(api: TestClient):
     assert res.status_code == status.HTTP_201_CREATED
 
     # 디렉토리 확인
-    from settings.base import SERVER
     main_root = f'{SERVER["storage"]}/storage/{res.json()["id"]}/root'
     
     assert os.path.isdir(main_root)
@@ -197,8 +180,7 @@ def test_success(api: TestClient):
 def test_limited_usage(api: TestClient):
     # 모든 유저가 해당 파티션의 50% 이상을 사용할 수 없다.
     # 10TB 이하의 파티션에 사용 권장.
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
     req = {
         'email': 'themail2@gmail.com',
         'name': 'user0021',
@@ -3,67 +3,61 @@ import os
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from main import app
-from system.bootloader import Bootloader
 from apps.auth.utils.managers import AppAuthManager
 from apps.user.utils.managers import UserCRUDManager
+from apps.data_tag.models import DataTag
+from apps.share.models import DataShared
+from apps.storage.models import DataInfo
+from apps.tag.models import Tag
+from system.connection.generators import DatabaseGenerator
 
 admin_info = None
 client_info = None
-
-@pytest.fixture(scope='module')
-def api():
-    global admin_info
-    global client_info
-    # Load Application
-    Bootloader.migrate_database()
-    Bootloader.init_storage()
-    # Add Admin
-    admin_info = {
+tokens = {}
+USERS_INFO = {
+    'admin': {
         'email': 'seokbong60@gmail.com',
         'name': 'jeonhyun',
         'passwd': 'password0123',
         'storage_size': 5,
         'is_admin': True,
-    }
-    admin = UserCRUDManager().create(**admin_info)
-    admin_info['id'] = admin.id
-    # Add Client
-    client_info = {
+    },
+    'client': {
         'email': 'seokbong61@gmail.com',
         'name': 'jeonghyun2',
         'passwd': 'passwd0123',
         'storage_size': 10,
-    }
-    client = UserCRUDManager().create(**client_info)
-    client_info['id'] = client.id
+    },
+}
+
+@pytest.fixture(scope='module')
+def api(bootstrapped_app):
+    global admin_info
+    global client_info
+    global tokens
+    api, users, tokens = bootstrapped_app
+    admin_info, client_info = users['admin'], users['client']
     # Return test api
-    yield TestClient(app)
-    # Remove All Of Data
-    Bootloader.remove_storage()
-    Bootloader.remove_database()
+    yield api
 
 def test_no_token(api: TestClient):
     res = api.delete(f'/api/users/{admin_info["id"]}')
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_no_admin(api: TestClient):
-    email, passwd = client_info['email'], client_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['client']
     
     res = api.delete(f'/api/users/{admin_info["id"]}', headers={'Token': token})
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
 
 def test_user_not_exists(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     res = api.delete(f'/api/users/0', headers={'Token': token})
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 def test_success(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     res = api.delete(f'/api/users/{client_info["id"]}', headers={'Token': token})
     assert res.status_code == status.HTTP_204_NO_CONTENT
@@ -85,8 +79,61 @@ def test_success(api: TestClient):
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 def test_remove_admin_user(api: TestClient):
-    email, passwd = admin_info['email'], admin_info['passwd']
-    token = AppAuthManager().login(email, passwd)
+    token = tokens['admin']
 
     res = api.delete(f'/api/users/{admin_info["id"]}', headers={'Token': token})
     assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_removed_user_token(api: TestClient):
+    """
+    삭제된 사용자의 토큰은 캐시에 남아있어도 사용할 수 없다.
+    """
+    user_info = {
+        'email': 'seokbong62@gmail.com',
+        'name': 'jeonghyun3',
+        'passwd': 'passwd0123',
+        'storage_size': 1,
+    }
+    user = UserCRUDManager().create(**user_info)
+    user_token = AppAuthManager().login(user_info['email'], user_info['passwd'])
+    admin_token = tokens['admin']
+
+    res = api.get(f'/api/users/{user.id}', headers={'Token': user_token})
+    assert res.status_code == status.HTTP_200_OK
+    res = api.delete(f'/api/users/{user.id}', headers={'Token': admin_token})
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    res = api.get(f'/api/users/{admin_info["id"]}', headers={'Token': user_token})
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_remove_user_with_tagged_data(api: TestClient):
+    """
+    사용자 삭제 시 데이터에 연결된 태그, 공유 정보도 같이 삭제
+    """
+    user_info = {
+        'email': 'seokbong63@gmail.com',
+        'name': 'jeonghyun4',
+        'passwd': 'passwd0123',
+        'storage_size': 1,
+    }
+    user = UserCRUDManager().create(**user_info)
+    with DatabaseGenerator.get_session() as session:
+        data = DataInfo(root='/', name='tagged', is_dir=True, user_id=user.id)
+        tag = Tag(name='removed')
+        session.add_all([data, tag])
+        session.flush()
+        session.add_all([
+            DataTag(datainfo_id=data.id, tag_id=tag.id),
+            DataShared(datainfo_id=data.id),
+        ])
+        session.commit()
+        tag_id = tag.id
+
+    token = tokens['admin']
+    res = api.delete(f'/api/users/{user.id}', headers={'Token': token})
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    with DatabaseGenerator.get_session() as session:
+        assert session.get(Tag, tag_id) is None
+        assert session.query(DataTag).count() == 0
+        assert session.query(DataShared).count() == 0
+        assert session.query(DataInfo) \
+            .filter(DataInfo.user_id == user.id).count() == 0
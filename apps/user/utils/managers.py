@@ -1,4 +1,8 @@
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional
+import hashlib
+import time
+
+from sqlalchemy.orm import Session
 
 from apps.user.models import User
 from apps.user.schemas import UserCreate, UserUpdate
@@ -6,6 +10,7 @@ from apps.user.utils.queries.user_db_query import UserDBQuery
 from apps.user.utils.queries.user_storage_query import UserStorageQuery
 from architecture.manager.backend_manager import CRUDManager
 from architecture.manager.base_manager import FrontendManager
+from core.caches import BloomFilter, TTLCache
 from core.exc import UserNotFound
 from core.permissions import (
     PermissionAdminChecker as AdminOnly,
@@ -17,6 +22,24 @@ from architecture.query.permission import (
 from architecture.query.permission import PermissionSameUserChecker as SameOnly
 from core.token_generators import LoginTokenGenerator
 
+# 로그인용 사용자 캐시 (email -> (user_id, passwd))
+LOGIN_USER_CACHE = TTLCache(ttl=60)
+# 존재하는 email 목록, 서버 시작 시 Bootloader에서 채운다.
+USER_EMAIL_FILTER = BloomFilter()
+# 로그인 토큰별 요청자 캐시 (sha256(token) -> Operator)
+# 토큰 원문은 메모리에 남기지 않는다.
+OPERATOR_CACHE = TTLCache(ttl=60, maxsize=10000)
+
+
+class Operator(NamedTuple):
+    """
+    토큰으로 확인된 요청자 정보
+    """
+    id: int
+    is_admin: bool
+    issue: str
+    expired: float
+
 class UserCRUDManager(CRUDManager):
 
 
@@ -27,6 +50,7 @@ class UserCRUDManager(CRUDManager):
         passwd: str,
         storage_size: int,
         is_admin: bool = False,
+        session: Optional[Session] = None,
     ) -> User:
         # DB Upload
         # schema -> 실패 시 Validation Error
@@ -38,22 +62,50 @@ class UserCRUDManager(CRUDManager):
             is_admin=is_admin
         )
 
-        user: User = UserDBQuery().create(user_schema)
+        user: User = UserDBQuery().create(user_schema, session=session)
+        LOGIN_USER_CACHE.pop(user.email)
+        USER_EMAIL_FILTER.add(user.email)
         # Directory 생성
         try:
             UserStorageQuery().create(user_id=user.id, force=True)
         except Exception as e:
             # 실패시 User 삭제
-            UserDBQuery().destroy(user_id=user.id)
+            UserDBQuery().destroy(user_id=user.id, session=session)
             raise e
         else:
             return user
 
+    def bulk_create(self, users_info: List[Dict[str, Any]]) -> List[User]:
+        """
+        여러 유저를 한번에 생성
+
+        :param users_info: create에 들어가는 인자들의 리스트
+        """
+        # schema -> 실패 시 Validation Error
+        user_schemas = [
+            UserCreate(**{'is_admin': False, **info}) for info in users_info]
+        users: List[User] = UserDBQuery().bulk_create(user_schemas)
+        for user in users:
+            LOGIN_USER_CACHE.pop(user.email)
+            USER_EMAIL_FILTER.add(user.email)
+        # Directory 생성
+        try:
+            for user in users:
+                UserStorageQuery().create(user_id=user.id, force=True)
+        except Exception as e:
+            # 실패시 User 삭제
+            for user in users:
+                UserDBQuery().destroy(user_id=user.id)
+            raise e
+        else:
+            return users
+
     def update(
         self,
         user_id: int,
         name: str,
         passwd: str = None,
+        session: Optional[Session] = None,
     ) -> User:
         # Make Schema
         update_schema = UserUpdate(
@@ -62,7 +114,9 @@ class UserCRUDManager(CRUDManager):
             passwd=passwd
         )
         # Update
-        user: User = UserDBQuery().update(update_schema)
+        user: User = UserDBQuery().update(update_schema, session=session)
+        # 패스워드가 바뀌었을 수 있으므로 로그인 캐시 제거
+        LOGIN_USER_CACHE.pop(user.email)
         # get user model
         return user
     
@@ -70,40 +124,53 @@ class UserCRUDManager(CRUDManager):
         self,
         user_name: Optional[str] = None,
         user_email: Optional[str] = None,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        session: Optional[Session] = None,
     ) -> Optional[User]:
         return UserDBQuery().read(
             user_name=user_name,
             user_email=user_email,
             user_id=user_id,
+            session=session,
         )
 
     def destroy(
         self,
         user_name: Optional[str] = None,
         user_email: Optional[str] = None,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        session: Optional[Session] = None,
     ):
         removed_id = UserDBQuery().destroy(
             user_name=user_name,
             user_email=user_email,
-            user_id=user_id
+            user_id=user_id,
+            session=session,
         )
+        # 어떤 email이 삭제되었는지 알 수 없으므로 전부 제거
+        LOGIN_USER_CACHE.clear()
+        OPERATOR_CACHE.clear()
         UserStorageQuery().destroy(user_id=removed_id)
     
-    def search(self) -> List[User]:
-        return UserDBQuery().search()
+    def search(self, session: Optional[Session] = None) -> List[User]:
+        return UserDBQuery().search(session=session)
 
 class UserManager(FrontendManager):
 
-    def create_user(
+    def _read_operator(
         self,
         token: str,
-        email: str,
-        name: str,
-        passwd: str,
-        storage_size: int
-    ) -> User:
+        session: Optional[Session] = None,
+    ) -> Operator:
+        """
+        token에서 요청자 정보 추출
+
+        최근에 확인된 token은 DB를 다시 조회하지 않는다.
+        """
+        key = hashlib.sha256(token.encode('utf-8')).digest()
+        operator: Optional[Operator] = OPERATOR_CACHE.get(key)
+        if operator and time.time() <= operator.expired:
+            return operator
         try:
             # token에서 해당 유저 정보를 추출
             decoded_token = LoginTokenGenerator().decode(token)
@@ -111,12 +178,33 @@ class UserManager(FrontendManager):
             issue = decoded_token['iss']
         except Exception:
             raise PermissionError()
-        # Email에 대한 User 데이터 가져오기
-        operator: User = UserCRUDManager().read(user_email=op_email)
-        if not operator:
-            # 해당 Email에 대한 User가 없는 경우
+        # Email에 대한 유저가 존재하지 않으면 Permisson Failed
+        user: User = \
+            UserCRUDManager().read(user_email=op_email, session=session)
+        if not user:
             raise PermissionError()
-        if not bool(AdminOnly(operator.is_admin) & LoginedOnly(issue)):
+        operator = Operator(
+            id=user.id,
+            is_admin=user.is_admin,
+            issue=issue,
+            expired=decoded_token['exp'],
+        )
+        OPERATOR_CACHE.set(key, operator)
+        return operator
+
+    def create_user(
+        self,
+        token: str,
+        email: str,
+        name: str,
+        passwd: str,
+        storage_size: int,
+        session: Optional[Session] = None,
+    ) -> User:
+        operator = self._read_operator(token, session)
+        if not bool(
+            AdminOnly(operator.is_admin) & LoginedOnly(operator.issue)
+        ):
             # 관리자, 로그인 상태 둘 중 하나라도 아니면 Permisson Failed
             raise PermissionError()
         # User 생성을 위한 Create Format 생성
@@ -124,46 +212,39 @@ class UserManager(FrontendManager):
             email=email,
             name=name,
             passwd=passwd,
-            storage_size=storage_size
+            storage_size=storage_size,
+            session=session,
         )
 
-    def read_user(self, token: str, pk: int) -> User:
-        try:
-            # token에서 해당 유저 정보를 추출
-            decoded_token = LoginTokenGenerator().decode(token)
-            op_email = decoded_token['email']
-            issue = decoded_token['iss']
-        except Exception:
-            raise PermissionError()
-        # Email에 대한 유저가 존재하지 않으면 Permisson Failed
-        operator: User = UserCRUDManager().read(user_email=op_email)
-        if not operator:
-            raise PermissionError()
-        if not bool(LoginedOnly(issue)):
+    def read_user(
+        self,
+        token: str,
+        pk: int,
+        session: Optional[Session] = None,
+    ) -> User:
+        operator = self._read_operator(token, session)
+        if not bool(LoginedOnly(operator.issue)):
             # Login 상태가 아니면 Permisson Failed
             raise PermissionError()
         # User 검색, 없으면 None
-        user: User = UserCRUDManager().read(user_id=pk)
+        user: User = UserCRUDManager().read(user_id=pk, session=session)
         if not user:
             # 검색 대상의 사용자가 없음
             raise UserNotFound()
         return user
 
-    def update_user(self, token: str, pk: int, name: str, passwd: str = '') -> User:
-        try:
-            # token에서 해당 유저 정보를 추출
-            decoded_token = LoginTokenGenerator().decode(token)
-            op_email = decoded_token['email']
-            issue = decoded_token['iss']
-        except Exception:
-            raise PermissionError()
-        # Email에 대한 유저 정보가 들어있지 않으면 PermissonFailed
-        operator: User = UserCRUDManager().read(user_email=op_email)
-        if not operator:
-            raise PermissionError()
+    def update_user(
+        self,
+        token: str,
+        pk: int,
+        name: str,
+        passwd: str = '',
+        session: Optional[Session] = None,
+    ) -> User:
+        operator = self._read_operator(token, session)
         # Admin이거나, client and 자기 자신이어야 한다
         if not bool(
-            LoginedOnly(issue) & (
+            LoginedOnly(operator.issue) & (
                 AdminOnly(operator.is_admin) | 
                 ((~AdminOnly(operator.is_admin)) & OnlyMine(operator.id, pk))
             )
@@ -173,68 +254,55 @@ class UserManager(FrontendManager):
         user: User = UserCRUDManager().update(
             user_id=pk,
             name=name,
-            passwd=passwd
+            passwd=passwd,
+            session=session,
         )
         return user
 
-    def remove_user(self, token: str, pk: int):
-        try:
-            # token에서 해당 유저 정보를 추출
-            decoded_token = LoginTokenGenerator().decode(token)
-            op_email = decoded_token['email']
-            issue = decoded_token['iss']
-        except Exception:
-            raise PermissionError()
-        # Email에 대한 유저가 존재하지 않으면 Permisson Failed
-        operator: User = UserCRUDManager().read(user_email=op_email)
-        if not operator:
-            raise PermissionError()
+    def remove_user(
+        self,
+        token: str,
+        pk: int,
+        session: Optional[Session] = None,
+    ):
+        operator = self._read_operator(token, session)
         # Login상태 and Admin이 아니면 다른 유저를 삭제할 수 없다
         # 그리고 Admin이 자신을 삭제할 수 없다.
         if not bool(
             AdminOnly(operator.is_admin) 
-            & LoginedOnly(issue) 
+            & LoginedOnly(operator.issue) 
             & (~SameOnly(operator.id, pk))
         ):
             raise PermissionError()
-        UserCRUDManager().destroy(user_id=pk)
+        UserCRUDManager().destroy(user_id=pk, session=session)
 
-    def search_users(self, token: str) -> List[User]:
-        try:
-            # token에서 해당 유저 정보를 추출
-            decoded_token = LoginTokenGenerator().decode(token)
-            op_email = decoded_token['email']
-            issue = decoded_token['iss']
-        except Exception:
-            raise PermissionError()
-        # Email에 대한 유저가 존재하지 않으면 Permisson Failed
-        operator: User = UserCRUDManager().read(user_email=op_email)
-        if not operator:
-            raise PermissionError()
+    def search_users(
+        self,
+        token: str,
+        session: Optional[Session] = None,
+    ) -> List[User]:
+        operator = self._read_operator(token, session)
         # Permisson Check
-        if not bool(AdminOnly(operator.is_admin) & LoginedOnly(issue)):
+        if not bool(
+            AdminOnly(operator.is_admin) & LoginedOnly(operator.issue)
+        ):
             raise PermissionError()
         # page parameter Integer 변형
-        return UserCRUDManager().search()
+        return UserCRUDManager().search(session=session)
 
 
-    def get_user_usage(self, token: str, user_id: int):
-        try:
-            # token에서 해당 유저 정보를 추출
-            decoded_token = LoginTokenGenerator().decode(token)
-            op_email = decoded_token['email']
-            issue = decoded_token['iss']
-        except Exception:
-            raise PermissionError()
-        # Email에 대한 유저가 존재하지 않으면 Permisson Failed
-        operator: User = UserCRUDManager().read(user_email=op_email)
-        if not operator:
-            raise PermissionError()
+    def get_user_usage(
+        self,
+        token: str,
+        user_id: int,
+        session: Optional[Session] = None,
+    ):
+        operator = self._read_operator(token, session)
         # Permission Check
         # Admin이거나, client and 자기 자신이어야 한다
         if not bool(
-            LoginedOnly(issue) & (
+            LoginedOnly(operator.issue) & (
                 AdminOnly(operator.is_admin) | 
                 ((~AdminOnly(operator.is_admin)) & OnlyMine(operator.id, user_id)))):
             raise PermissionError()
-        return UserDBQuery().read_usage(user_id)
+        return UserDBQuery().read_usage(user_id, session=session)
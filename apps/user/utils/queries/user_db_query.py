@@ -1,4 +1,5 @@
-from sqlalchemy import and_, or_
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from typing import Dict, List, Optional
 import bcrypt
@@ -6,6 +7,8 @@ import shutil
 
 from apps.user.models import User
 from apps.data_tag.models import DataTag
+from apps.data_tag.utils.queries import DataTagQuery
+from apps.share.models import DataShared
 from apps.storage.models import DataInfo
 from apps.tag.models import Tag
 from apps.user.schemas import UserCreate, UserUpdate
@@ -18,15 +21,60 @@ from architecture.query.crud import (
     QueryUpdator
 )
 from core.exc import UsageLimited, UserAlreadyExists, UserNotFound
-from settings.base import SERVER
+from settings.base import PASSWD, SERVER
 from system.connection.generators import DatabaseGenerator
 
 
 
+def _check_usage(session, created_size: int):
+    """
+    모든 유저가 사용하는 모든 용량이
+    해당 파티션의 남아있는 용량의 50%
+    이상을 넘어가면 안된다.
+
+    :param created_size: 새로 생성될 유저들의 최대 용량 합 (GB)
+    """
+    # 모든 사용자가 사용하고 있는 용량의 합
+    user_all_size = session.query(func.sum(User.storage_size)).scalar()
+    if user_all_size is None:
+        user_all_size = 0
+    user_all_size *= (10 ** 9) # GB -> byte
+    # 실제로 사용되고 있는 용량 (모든 파일의 크기)
+    already_used = session.query(func.sum(DataInfo.size)).scalar()
+    if already_used is None:
+        already_used = 0
+    created_user_size = created_size * (10 ** 9) # GB -> byte
+    # 해당 파티션에 남아있는 용량 구하기
+    _, _, disk_free = shutil.disk_usage(SERVER['storage'])
+    # real_free = 실제로 사용할 수 있는 남은 공간
+    real_free = disk_free - already_used
+    # (생성될 유저의 최대 용량 + 현재 모든 사용자의 최대 용량) / (사용 가능한 용량)
+    # 0.5 이상 넘어가면 안됨
+    percentage = (user_all_size + created_user_size) / real_free
+    if percentage >= 0.5:
+        raise UsageLimited()
+
+def _make_user(user_format: UserCreate) -> User:
+    # Serializer -> Dict
+    request = user_format.dict()
+    # 패스워드 암호화
+    request['passwd'] = \
+        bcrypt.hashpw(
+            request['passwd'].encode('utf-8'),
+            bcrypt.gensalt(rounds=PASSWD['bcrypt-rounds']))
+    return User(**request)
+
+
 class UserDBQueryCreator(QueryCreator):
-    def __call__(self, user_format: UserCreate) -> User:
+    def __call__(
+        self,
+        user_format: UserCreate,
+        session: Optional[Session] = None,
+    ) -> User:
 
-        session = DatabaseGenerator.get_session()
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(User)
         # 동일한 name이나 email이 있으면 안된다.
         if q.filter(or_(
@@ -38,44 +86,12 @@ class UserDBQueryCreator(QueryCreator):
             # admin은 단 하나만 생성할 수 있다.
             raise PermissionError()
         try:
-            # DB 저장
-            """
-            모든 유저가 사용하는 모든 용량이
-            해당 파티션의 남아있는 용량의 50%
-            이상을 넘어가면 안된다.
-            """
-            # 모든 사용자가 사용하고 있는 용량의 합
-            user_all_size = session.query(func.sum(User.storage_size)).scalar()
-            if user_all_size is None:
-                user_all_size = 0
-            user_all_size *= (10 ** 9) # GB -> byte
-            # 실제로 사용되고 있는 용량 (모든 파일의 크기)
-            already_used = session.query(func.sum(DataInfo.size)).scalar()
-            if already_used is None:
-                already_used = 0
-            created_user_size = user_format.storage_size * (10 ** 9) # GB -> byte
-            # 해당 파티션에 남아있는 용량 구하기
-            _, _, disk_free = shutil.disk_usage(SERVER['storage'])
-            # real_free = 실제로 사용할 수 있는 남은 공간
-            real_free = disk_free - already_used
-            # (생성될 유저의 최대 용량 + 현재 모든 사용자의 최대 용량) / (사용 가능한 용량)
-            # 0.5 이상 넘어가면 안됨
-            percentage = (user_all_size + created_user_size) / real_free
-            if percentage >= 0.5:
-                raise UsageLimited()
-
-            # Serializer -> Dict
-            request = user_format.dict()
-            # 패스워드 암호화
-            request['passwd'] = \
-                bcrypt.hashpw(
-                    request['passwd'].encode('utf-8'),
-                    bcrypt.gensalt())
+            # 용량 체크
+            _check_usage(session, user_format.storage_size)
             # DB 업로드
-            user: User = User(**request)
+            user: User = _make_user(user_format)
             session.add(user)
             session.commit()
-            session.refresh(user)
         except Exception as e:
             # 실패 시 rollback
             session.rollback()
@@ -83,12 +99,19 @@ class UserDBQueryCreator(QueryCreator):
         else:
             return user
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class UserDBQueryUpdator(QueryUpdator):
-    def __call__(self, update_format: UserUpdate) -> User:
+    def __call__(
+        self,
+        update_format: UserUpdate,
+        session: Optional[Session] = None,
+    ) -> User:
 
-        session = DatabaseGenerator.get_session()
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(User)
         # 해당 유저가 존재하는 지 확인한다.
         user: User = q.filter(User.id == update_format.id).scalar()
@@ -101,7 +124,7 @@ class UserDBQueryUpdator(QueryUpdator):
             # 암호화 해서 저장
             user.passwd = bcrypt.hashpw(
                 update_format.passwd.encode('utf-8'),
-                bcrypt.gensalt())
+                bcrypt.gensalt(rounds=PASSWD['bcrypt-rounds']))
         # 커밋
         try:
             session.commit()
@@ -113,7 +136,8 @@ class UserDBQueryUpdator(QueryUpdator):
         else:
             return user
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 
 class UserDBQueryReader(QueryReader):
@@ -123,9 +147,13 @@ class UserDBQueryReader(QueryReader):
         user_email: Optional[str] = None, 
         user_id: Optional[int] = None,
         is_admin: Optional[bool] = False,
+        session: Optional[Session] = None,
     ) -> Optional[User]:
 
-        session = DatabaseGenerator.get_session()
+        # 주입된 세션이 없는 경우에만 직접 열고 닫는다.
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(User)
         user: User = None
         try:
@@ -143,7 +171,8 @@ class UserDBQueryReader(QueryReader):
         else:
             return user
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 
 class UserDBQueryDestroyer(QueryDestroyer):
@@ -151,10 +180,13 @@ class UserDBQueryDestroyer(QueryDestroyer):
         self,
         user_name: Optional[str] = None, 
         user_email: Optional[str] = None, 
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        session: Optional[Session] = None,
     ) -> int:
 
-        session = DatabaseGenerator.get_session()
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(User)
         user: User = None
         try:
@@ -166,17 +198,27 @@ class UserDBQueryDestroyer(QueryDestroyer):
                 user = q.filter(User.id == user_id).scalar()    
             # 모든 DB데이터 삭제
             if user:
-
-                # Data 관련 Tag 제거
-                data_infos = session.query(DataInfo, DataTag, Tag).filter(and_(
-                    DataInfo.id == user.id,
-                    DataTag.datainfo_id == DataInfo.id,
-                    Tag.id == DataTag.tag_id,
-                )).all()
-                for _, _, tag in data_infos:
-                    session.delete(tag)
+                # 사용자의 데이터와 관련된 태그, 공유 정보를 한번에 삭제
+                # bulk delete에는 ORM cascade가 적용되지 않으므로 직접 지운다.
+                data_ids = select(DataInfo.id) \
+                    .where(DataInfo.user_id == user.id)
+                session.query(Tag).filter(Tag.id.in_(
+                    select(DataTag.tag_id)
+                        .where(DataTag.datainfo_id.in_(data_ids))
+                )).delete(synchronize_session=False)
+                session.query(DataTag) \
+                    .filter(DataTag.datainfo_id.in_(data_ids)) \
+                    .delete(synchronize_session=False)
+                session.query(DataShared) \
+                    .filter(DataShared.datainfo_id.in_(data_ids)) \
+                    .delete(synchronize_session=False)
+                session.query(DataInfo) \
+                    .filter(DataInfo.user_id == user.id) \
+                    .delete(synchronize_session=False)
                 session.delete(user)
                 session.commit()
+                # 삭제된 데이터의 태그 캐시 제거
+                DataTagQuery.invalidate()
             else:
                 # 삭제 대상의 유저가 없는 경우
                 raise UserNotFound()
@@ -186,11 +228,14 @@ class UserDBQueryDestroyer(QueryDestroyer):
         else:
             return user.id
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class UserDBQuerySearcher(QuerySearcher):
-    def __call__(self):
-        session = DatabaseGenerator.get_session()
+    def __call__(self, session: Optional[Session] = None):
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
         q = session.query(User)
         try:
             users: List[User] = \
@@ -200,7 +245,8 @@ class UserDBQuerySearcher(QuerySearcher):
         else:
             return users
         finally:
-            session.close()
+            if own_session:
+                session.close()
 
 class UserDBQuery(QueryCRUD):
     reader = UserDBQueryReader
@@ -209,21 +255,76 @@ class UserDBQuery(QueryCRUD):
     updator = UserDBQueryUpdator
     searcher = UserDBQuerySearcher
 
-    def read_usage(self, user_id: int) -> Dict[str, int]:
-        # 사용량 구하기
+    def bulk_create(self, user_formats: List[UserCreate]) -> List[User]:
+        """
+        여러 유저를 한 트랜잭션으로 생성
+        검사 조건은 create와 같다.
+        """
+        names = [f.name for f in user_formats]
+        emails = [f.email for f in user_formats]
+        if len(set(names)) != len(names) or len(set(emails)) != len(emails):
+            # 요청 안에서 중복
+            raise UserAlreadyExists()
         session = DatabaseGenerator.get_session()
-        # Check User Data
-        user: User = \
-            session.query(User) \
-                .filter(User.id == user_id).scalar()
-        if not user:
-            raise UserNotFound()
-        entire = user.storage_size * (10 ** 9) # GB -> Byte
-        # Check Usage size
-        used = session.query(func.sum(DataInfo.size)) \
-            .filter(DataInfo.user_id == user_id) \
-            .group_by(DataInfo.user_id).scalar()
-        return {
-            'entire': entire,
-            'used': used if used else 0
-        }
\ No newline at end of file
+        q = session.query(User)
+        try:
+            # 동일한 name이나 email이 있으면 안된다.
+            if q.filter(or_(
+                User.name.in_(names),
+                User.email.in_(emails),
+            )).first():
+                raise UserAlreadyExists()
+            admin_count = len([f for f in user_formats if f.is_admin])
+            if admin_count > 1 or \
+                (admin_count and q.filter(User.is_admin == True).first()):
+                # admin은 단 하나만 생성할 수 있다.
+                raise PermissionError()
+            # 용량 체크
+            _check_usage(session, sum(f.storage_size for f in user_formats))
+            # DB 업로드
+            users: List[User] = [_make_user(f) for f in user_formats]
+            session.add_all(users)
+            session.commit()
+            # 생성된 유저를 한번에 다시 읽는다.
+            created = {
+                user.email: user
+                for user in q.filter(User.email.in_(emails)).all()
+            }
+            users = [created[email] for email in emails]
+        except Exception as e:
+            # 실패 시 rollback
+            session.rollback()
+            raise e
+        else:
+            return users
+        finally:
+            session.close()
+
+    def read_usage(
+        self,
+        user_id: int,
+        session: Optional[Session] = None,
+    ) -> Dict[str, int]:
+        # 사용량 구하기
+        own_session = session is None
+        if own_session:
+            session = DatabaseGenerator.get_session()
+        try:
+            # Check User Data
+            user: User = \
+                session.query(User) \
+                    .filter(User.id == user_id).scalar()
+            if not user:
+                raise UserNotFound()
+            entire = user.storage_size * (10 ** 9) # GB -> Byte
+            # Check Usage size
+            used = session.query(func.sum(DataInfo.size)) \
+                .filter(DataInfo.user_id == user_id) \
+                .group_by(DataInfo.user_id).scalar()
+            return {
+                'entire': entire,
+                'used': used if used else 0
+            }
+        finally:
+            if own_session:
+                session.close()
\ No newline at end of file
@@ -1,12 +1,13 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, Request, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Response
+from sqlalchemy.orm import Session
+import orjson
 import pydantic
-import json
 
 from apps.user.models import User
 from apps.user.schemas import UserRead
 from apps.user.utils.managers import UserManager
-from core.exc import UsageLimited, UserAlreadyExists, UserNotFound
+from core.dependencies import db_session, login_token
 
 
 user_router = APIRouter(
@@ -23,6 +24,8 @@ user_search_router = APIRouter(
 class UserView:
 
     """
+    공통 예외는 core.exception_handlers에서 응답으로 변환된다.
+
     (POST)  /api/users           # 생성
     (GET)   /api/users/{id}      # 유저 정보 가지고오기
     (PATCH) /api/users/{id}      # 유저 정보 업데이트하기
@@ -33,59 +36,27 @@ class UserView:
         path='',
         status_code=status.HTTP_201_CREATED,
         response_model=UserRead)
-    async def create_user(request: Request):
-        try:
-            # 토큰 가져오기
-            token = request.headers['token']
-        except KeyError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='요청 토큰이 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        
-        try:
-            # 요청 데이터 가져오기
-            req = await request.json()
-        except json.decoder.JSONDecodeError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='요청 데이터가 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
+    async def create_user(
+        request: Request,
+        token: str = Depends(login_token),
+        db: Session = Depends(db_session),
+    ):
+        # 요청 데이터 가져오기 (orjson 파싱)
+        req = orjson.loads(await request.body())
 
         try:
             # 사용자 추가하기
-            user: User = UserManager().create_user(token=token, **req)
-        except UsageLimited:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail='해당 용량으로는 더이상 유저를 생성할 수 없습니다.')
+            user: User = UserManager() \
+                .create_user(token=token, session=db, **req)
         except TypeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail='요청 데이터의 일부가 빠져있습니다.')
-        except PermissionError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='권한이 없습니다.')
         except pydantic.ValidationError as e:
-            msg = str(e.args[0][0].exc)
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=msg)
-        except UserAlreadyExists:
+            # 요청 데이터 검증 실패 (첫번째 에러 메세지만 전달)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail='해당 정보를 가진 사용자가 이미 존재합니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
+                detail=e.errors()[0]['msg'])
         else:
             return user
 
@@ -95,95 +66,44 @@ class UserView:
         path='/{pk}',
         status_code=status.HTTP_200_OK,
         response_model=UserRead)
-    async def get_user(request: Request, pk: int):
-        try:
-            # 토큰 가져오기
-            token = request.headers['token']
-        except KeyError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='요청 토큰이 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-
-        try:
-            # 사용자 검색하기
-            user: User = UserManager().read_user(token, pk)
-        except PermissionError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='권한이 없습니다.')
-        except UserNotFound:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='검색 대상의 사용자가 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        else:
-            return user
+    async def get_user(
+        pk: int,
+        token: str = Depends(login_token),
+        db: Session = Depends(db_session),
+    ):
+        # 사용자 검색하기
+        return UserManager().read_user(token, pk, session=db)
 
     @staticmethod
     @user_router.patch(
         path='/{pk}',
         status_code=status.HTTP_200_OK,
         response_model=UserRead)
-    async def update_user(request: Request, pk: int):
-        try:
-            # 토큰 가져오기
-            token = request.headers['token']
-        except KeyError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='요청 토큰이 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        
-        try:
-            # 요청 데이터 가져오기
-            req = await request.json()
-        except json.decoder.JSONDecodeError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='요청 데이터가 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
+    async def update_user(
+        request: Request,
+        pk: int,
+        token: str = Depends(login_token),
+        db: Session = Depends(db_session),
+    ):
+        # 요청 데이터 가져오기 (orjson 파싱)
+        req = orjson.loads(await request.body())
 
         try:
             # 업데이트 하기
             user: User = UserManager() \
                 .update_user(
                     token=token,
-                    pk=pk, **req
+                    pk=pk, session=db, **req
                 )
         except TypeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail='요청 데이터의 일부가 빠져있습니다.')
-        except PermissionError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='권한이 없습니다.')
-        except UserNotFound:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='없는 사용자 입니다.')
         except pydantic.ValidationError as e:
-            msg = str(e.args[0][0].exc)
+            # 요청 데이터 검증 실패 (첫번째 에러 메세지만 전달)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=msg)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
+                detail=e.errors()[0]['msg'])
         else:
             return user
 
@@ -191,36 +111,14 @@ class UserView:
     @user_router.delete(
         path='/{pk}',
         status_code=status.HTTP_204_NO_CONTENT)
-    async def remove_user(request: Request, pk: int):
-        try:
-            # 토큰 가져오기
-            token = request.headers['token']
-        except KeyError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='요청 토큰이 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        
-        try:
-            # 유저 삭제하기
-            UserManager().remove_user(token, pk)
-        except PermissionError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='권한이 없습니다.')
-        except UserNotFound:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='검색 대상의 사용자가 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        else:
-            return Response(status_code=status.HTTP_204_NO_CONTENT)
+    async def remove_user(
+        pk: int,
+        token: str = Depends(login_token),
+        db: Session = Depends(db_session),
+    ):
+        # 유저 삭제하기
+        UserManager().remove_user(token, pk, session=db)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 class UserUsageView:
     """
@@ -234,34 +132,13 @@ class UserUsageView:
     @user_router.get(
         path='/{pk}/usage',
         status_code=status.HTTP_200_OK)
-    def get_user_usage(request: Request, pk: int):
-        try:
-            # 토큰 가져오기
-            token = request.headers['token']
-        except KeyError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='요청 토큰이 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        try:
-            res = UserManager().get_user_usage(token=token, user_id=pk)
-        except PermissionError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='권한이 없습니다.')
-        except UserNotFound:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='검색 대상의 사용자가 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        else:
-            return res
+    def get_user_usage(
+        pk: int,
+        token: str = Depends(login_token),
+        db: Session = Depends(db_session),
+    ):
+        return UserManager() \
+            .get_user_usage(token=token, user_id=pk, session=db)
 
 class UserSearchView:
     """
@@ -272,38 +149,8 @@ class UserSearchView:
         path='',
         status_code=status.HTTP_200_OK,
         response_model=List[UserRead])
-    async def search_users(request: Request):
-        try:
-            # 토큰 가져오기
-            token = request.headers['token']
-        except KeyError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='요청 토큰이 없습니다.')
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        
-        try:
-            users: List[User] = \
-                UserManager().search_users(token=token)
-        except TypeError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='요청 데이터의 일부가 빠졌습니다.')
-        except PermissionError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='권한이 없습니다.')
-        except ValueError as e:
-            # 검색 쿼리 Validation Error
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e))
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='server error')
-        else:
-            return users
\ No newline at end of file
+    async def search_users(
+        token: str = Depends(login_token),
+        db: Session = Depends(db_session),
+    ):
+        return UserManager().search_users(token=token, session=db)
\ No newline at end of file
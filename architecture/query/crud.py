@@ -1,66 +1,134 @@
-from abc import ABC, ABCMeta, abstractmethod
+from typing import Any, Callable, Optional, Protocol, Type
 
-from typing import Type
-
-class QueryMethod(metaclass=ABCMeta):
-    @abstractmethod
-    def __call__(self, *args, **kwargs):
-        pass
-
-
-class QueryReader(QueryMethod, ABC):
-    @abstractmethod
-    def __call__(self, *args, **kwargs):
-        pass
-
-
-class QueryCreator(QueryMethod, ABC):
-    @abstractmethod
-    def __call__(self, *args, **kwargs):
-        pass
-
-
-class QueryUpdator(QueryMethod, ABC):
-    @abstractmethod
-    def __call__(self, *args, **kwargs):
-        pass
 
+class QueryMethod(Protocol):
+    """
+    Query 하나를 실행하는 callable
 
-class QueryDestroyer(QueryMethod, ABC):
-    @abstractmethod
+    ABC를 사용하지 않으므로 인스턴스 생성 시
+    추상 메소드 검사가 일어나지 않는다.
+    """
     def __call__(self, *args, **kwargs):
-        pass
-
-
-class QuerySearcher(QueryMethod, ABC):
-    @abstractmethod
-    def __call__(self, *args, **kwargs):
-        pass
-
-class QueryCRUD(metaclass=ABCMeta):
-    creator: Type[QueryCreator] = None
-    reader: Type[QueryReader] = None
-    updator: Type[QueryUpdator] = None
-    destroyer: Type[QueryDestroyer] = None
-    searcher: Type[QuerySearcher] = None
-
-    def _run_query(self, method: Type[QueryMethod], *args, **kwargs):
-        if not method:
-            raise PermissionError('method not allowed')
-        return method()(*args, **kwargs)
-
-    def create(self, *args, **kwargs):
-        return self._run_query(self.creator, *args, **kwargs)
-
-    def read(self, *args, **kwargs):
-        return self._run_query(self.reader, *args, **kwargs)
-
-    def update(self, *args, **kwargs):
-        return self._run_query(self.updator, *args, **kwargs)
-
-    def destroy(self, *args, **kwargs):
-        return self._run_query(self.destroyer, *args, **kwargs)
-    
-    def search(self, *args, **kwargs):
-        return self._run_query(self.searcher, *args, **kwargs)
-
+        ...
+
+
+class QueryReader:
+    pass
+
+
+class QueryCreator:
+    pass
+
+
+class QueryUpdator:
+    pass
+
+
+class QueryDestroyer:
+    pass
+
+
+class QuerySearcher:
+    pass
+
+def _not_allowed(self, *args, **kwargs):
+    raise PermissionError('method not allowed')
+
+def _cached_read(cache: Any, method: Callable) -> staticmethod:
+    """
+    조회 결과를 인자 단위로 캐시하는 read
+    """
+    def read(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            result = cache.get(key)
+        except TypeError:
+            # hash 할 수 없는 인자는 캐시하지 않는다.
+            return method(*args, **kwargs)
+        if result is None:
+            result = method(*args, **kwargs)
+            cache.set(key, result)
+        return result
+    return staticmethod(read)
+
+def _invalidating(cache: Any, method: Callable) -> staticmethod:
+    """
+    실행 후 조회 캐시를 비우는 create/update/destroy
+    """
+    def run(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        finally:
+            cache.clear()
+    return staticmethod(run)
+
+
+class QueryCRUD:
+    """
+    create/read/update/destroy/search는
+    서브클래스 생성 시 한번만 연결한다.
+
+    Query 클래스는 상태를 갖지 않으므로 인스턴스 하나를 계속 사용하고
+    지정되지 않은 메소드는 PermissionError를 발생시킨다.
+    QueryCRUD 역시 상태가 없으므로 클래스마다 인스턴스는 하나만 생성된다.
+
+    read_cache (get, set, clear)를 지정하면 read 결과를 캐시하고
+    같은 QueryCRUD의 create/update/destroy가 실행될 때마다 비운다.
+    다른 곳에서 같은 데이터를 수정하는 경우 invalidate()를 호출해야 한다.
+    """
+    _instance: Optional['QueryCRUD'] = None
+    read_cache: Any = None
+
+    creator: Optional[Type[QueryMethod]] = None
+    reader: Optional[Type[QueryMethod]] = None
+    updator: Optional[Type[QueryMethod]] = None
+    destroyer: Optional[Type[QueryMethod]] = None
+    searcher: Optional[Type[QueryMethod]] = None
+
+    create = _not_allowed
+    read = _not_allowed
+    update = _not_allowed
+    destroy = _not_allowed
+    search = _not_allowed
+
+    def __new__(cls):
+        instance = cls._instance
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 부모 클래스의 인스턴스를 물려받지 않는다.
+        cls._instance = None
+        for name, attr in (
+            ('create', 'creator'),
+            ('read', 'reader'),
+            ('update', 'updator'),
+            ('destroy', 'destroyer'),
+            ('search', 'searcher'),
+        ):
+            method = getattr(cls, attr)
+            setattr(
+                cls, name,
+                _not_allowed if method is None else staticmethod(method()))
+        cache = cls.read_cache
+        if cache is not None:
+            if cls.reader is not None:
+                cls.read = _cached_read(cache, cls.read)
+            for name, attr in (
+                ('create', 'creator'),
+                ('update', 'updator'),
+                ('destroy', 'destroyer'),
+            ):
+                if getattr(cls, attr) is not None:
+                    setattr(cls, name, _invalidating(cache, getattr(cls, name)))
+
+    @classmethod
+    def invalidate(cls):
+        """
+        read 캐시 비우기
+        """
+        if cls.read_cache is not None:
+            cls.read_cache.clear()
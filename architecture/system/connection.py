@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod, ABC
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -120,6 +120,7 @@ class ProgramedRDBConnection(RDBConnection, ABC):
         database: str,
         user: str,
         passwd: str,
+        pool: Optional[Dict[str, Any]] = None,
     ):
         self.host = host
         self.port = port
@@ -131,10 +132,25 @@ class ProgramedRDBConnection(RDBConnection, ABC):
         self.url = \
             f'{database_type}://{user}:{passwd}@{host}:{port}/{database}'
         
-        self.engine = create_engine(self.url)
+        # 요청마다 새로 연결하지 않도록 커넥션 풀을 유지한다.
+        # pool: pool_size, max_overflow, pool_timeout, pool_recycle
+        pool_options = {
+            'pool_size': 20,
+            'max_overflow': 40,
+            'pool_recycle': 1800,   # wait_timeout 전에 커넥션 교체
+            **(pool or {}),
+        }
+        self.engine = create_engine(
+            self.url,
+            pool_pre_ping=True,     # 끊어진 커넥션 확인
+            pool_use_lifo=True,     # 최근 사용한 커넥션부터 재사용
+            **pool_options,
+        )
         self.session = sessionmaker(
             autocommit=False,
             autoflush=False,
+            # commit 후에도 이미 읽은 값을 그대로 사용한다. (refresh 불필요)
+            expire_on_commit=False,
             bind=self.engine,
         )
         self.base = declarative_base()
@@ -146,7 +162,8 @@ class MySQLConnection(ProgramedRDBConnection):
         port: int,
         database: str,
         user: str,
-        passwd: str
+        passwd: str,
+        pool: Optional[Dict[str, Any]] = None,
     ):
         super()._load(
             database_type='mysql',
@@ -155,6 +172,7 @@ class MySQLConnection(ProgramedRDBConnection):
             database=database,
             user=user,
             passwd=passwd,
+            pool=pool,
         )
 
 class MariaDBConnection(ProgramedRDBConnection):
@@ -164,7 +182,8 @@ class MariaDBConnection(ProgramedRDBConnection):
         port: int,
         database: str,
         user: str,
-        passwd: str
+        passwd: str,
+        pool: Optional[Dict[str, Any]] = None,
     ):
         super()._load(
             database_type='mariadb',
@@ -173,6 +192,7 @@ class MariaDBConnection(ProgramedRDBConnection):
             database=database,
             user=user,
             passwd=passwd,
+            pool=pool,
         )
 
 class SQLiteConnection(RDBConnection):
@@ -182,6 +202,8 @@ class SQLiteConnection(RDBConnection):
         self.session = sessionmaker(
             autocommit=False,
             autoflush=False,
+            # commit 후에도 이미 읽은 값을 그대로 사용한다. (refresh 불필요)
+            expire_on_commit=False,
             bind=self.engine,
         )
         self.base = declarative_base()
@@ -0,0 +1,112 @@
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+import hashlib
+import math
+import time
+
+from settings.base import SERVER
+
+
+class TTLCache:
+    """
+    프로세스 내부에서 사용하는 TTL 캐시
+
+    워커 프로세스 간에 공유되지 않으므로
+    값이 바뀌는 경우를 대비해 TTL을 짧게 잡는다.
+    워커가 여러 개인 경우 다른 워커의 변경(패스워드 변경, 사용자 삭제 등)을
+    알 수 없으므로 기본적으로 캐시를 사용하지 않는다.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 1024,
+        enabled: Optional[bool] = None,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # 지정하지 않으면 단일 워커인 경우에만 사용
+        self.enabled = SERVER['workers'] <= 1 if enabled is None else enabled
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expired, value = item
+            if expired < time.monotonic():
+                # 만료된 데이터
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # 가장 먼저 들어온 데이터부터 제거
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class BloomFilter:
+    """
+    문자열 전용 Bloom Filter
+
+    load()로 전체 데이터를 채우기 전까지는 비활성 상태이며
+    비활성 상태에서는 모든 값이 존재하는 것으로 판단한다.
+    (false negative가 없어야 하므로 삭제는 지원하지 않는다.)
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        # 비트 수, 해시 수 계산
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.active = False
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = Lock()
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        with self._lock:
+            for pos in self._positions(key):
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def load(self, keys: Iterable[str]):
+        """
+        전체 데이터로 다시 채운 뒤 활성화
+        """
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+        for key in keys:
+            self.add(key)
+        self.active = True
+
+    def __contains__(self, key: str) -> bool:
+        if not self.active:
+            return True
+        bits = self._bits
+        return all(
+            bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(key)
+        )
@@ -0,0 +1,39 @@
+from typing import Iterator, Optional
+
+from fastapi import HTTPException, Security, status
+from fastapi.security import APIKeyHeader
+from sqlalchemy.orm import Session
+
+from system.connection.generators import DatabaseGenerator
+
+
+def db_session() -> Iterator[Session]:
+    """
+    요청 하나당 세션 하나를 사용하는 FastAPI dependency
+
+    요청 처리가 끝나면 commit, 에러가 발생하면 rollback 후 세션을 닫는다.
+    """
+    session = DatabaseGenerator.get_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+_token_header = APIKeyHeader(name='token', auto_error=False)
+
+def login_token(token: Optional[str] = Security(_token_header)) -> str:
+    """
+    요청 헤더의 로그인 토큰
+
+    APIKeyHeader의 auto_error는 403을 리턴하므로 직접 401을 리턴한다.
+    """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='요청 토큰이 없습니다.')
+    return token
@@ -0,0 +1,48 @@
+from typing import Any, Callable, Coroutine, Dict, Type
+import json
+
+from fastapi import Request, status
+from fastapi.responses import ORJSONResponse
+
+from core.exc import UsageLimited, UserAlreadyExists, UserNotFound
+
+Handler = Callable[[Request, Exception], Coroutine[Any, Any, ORJSONResponse]]
+
+
+def _detail_handler(status_code: int, detail: str) -> Handler:
+    """
+    항상 같은 status code, 메세지를 리턴하는 handler 생성
+    """
+    async def handler(request: Request, exc: Exception) -> ORJSONResponse:
+        return ORJSONResponse(
+            status_code=status_code,
+            content={'detail': detail})
+    return handler
+
+
+"""
+View에서 처리하지 않은 예외 -> HTTP 응답
+
+View는 자신에게만 해당하는 예외만 처리하고
+공통 예외는 여기서 한번에 변환한다.
+
+pydantic.ValidationError는 response_model 검증 실패(서버 오류)에서도
+발생하므로 여기서 변환하지 않고 요청을 검증하는 View에서 처리한다.
+"""
+EXCEPTION_HANDLERS: Dict[Type[Exception], Handler] = {
+    json.JSONDecodeError: _detail_handler(
+        status.HTTP_400_BAD_REQUEST,
+        '요청 데이터가 없습니다.'),
+    PermissionError: _detail_handler(
+        status.HTTP_401_UNAUTHORIZED,
+        '권한이 없습니다.'),
+    UserNotFound: _detail_handler(
+        status.HTTP_404_NOT_FOUND,
+        '검색 대상의 사용자가 없습니다.'),
+    UserAlreadyExists: _detail_handler(
+        status.HTTP_400_BAD_REQUEST,
+        '해당 정보를 가진 사용자가 이미 존재합니다.'),
+    UsageLimited: _detail_handler(
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        '해당 용량으로는 더이상 유저를 생성할 수 없습니다.'),
+}
@@ -1,17 +1,56 @@
+from typing import Optional, Tuple
 import sys
 from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.pool import QueuePool
 
+from apps.auth.utils.managers import shutdown_bcrypt_pool
 from apps.routers import API_ROUTERS
+from core.exception_handlers import EXCEPTION_HANDLERS
 from middlewares.file_filter import LimitUploadSize
 from settings.base import SERVER
-def init_app():
+from system.connection.generators import DatabaseGenerator
+
+
+def _prewarm_pool():
+    """
+    요청을 받기 전에 커넥션 풀을 미리 채운다.
+    첫 요청들이 동시에 커넥션을 여는 것을 막는다.
+    """
+    pool = DatabaseGenerator.get_engine().pool
+    if not isinstance(pool, QueuePool):
+        # sqlite는 커넥션을 유지하지 않는다.
+        return
+    conns = [pool.connect() for _ in range(pool.size())]
+    for conn in conns:
+        conn.close()
+
+def _dispose_pool():
+    """
+    서버 종료 시 풀에 남아있는 커넥션을 닫는다.
+    """
+    DatabaseGenerator.get_engine().dispose()
+
+def init_app(cors_origins: Optional[Tuple[str, ...]] = None):
     """
     앱 실행기
+
+    :param cors_origins: CORS 허용 origin, None이면 CORS를 설정하지 않는다.
     """
     # Swagger 지움
-    app = FastAPI(redoc_url=None, docs_url=None)
+    # 응답 직렬화는 orjson 사용
+    app = FastAPI(
+        redoc_url=None,
+        docs_url=None,
+        default_response_class=ORJSONResponse,
+        on_startup=[_prewarm_pool],
+        on_shutdown=[_dispose_pool, shutdown_bcrypt_pool])
     for router in API_ROUTERS:
         app.include_router(router)
+    # 공통 예외 -> HTTP 응답
+    for exc_class, handler in EXCEPTION_HANDLERS.items():
+        app.add_exception_handler(exc_class, handler)
     
     # 파일 업로드 미들웨어 설정
     max_file_size = 1 if 'pytest' in sys.modules \
@@ -19,4 +58,13 @@ def init_app():
     app.add_middleware(
         LimitUploadSize,
         max_size=max_file_size)
+    # Cors 설정
+    if cors_origins is not None:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=cors_origins,
+            allow_credentials=True,
+            allow_methods=['*'],
+            allow_headers=['token'],
+        )
     return app
\ No newline at end of file
@@ -6,6 +6,6 @@ class AppTokenBuilder(JwtBuilder):
     """
     Token 생성 또는 읽을 때 사용
     """
-    data_map = ('iss', 'email', 'iat', 'exp')
+    data_map = ('iss', 'email', 'user_id', 'iat', 'exp')
     jwt_key = JWT['key']
     jwt_algorithm = JWT['algorithm']
@@ -0,0 +1,41 @@
+from typing import Iterator
+from urllib.parse import quote
+import mimetypes
+
+from fastapi.responses import FileResponse, StreamingResponse
+
+
+def file_download_response(path: str, name: str) -> FileResponse:
+    """
+    파일 다운로드 Response
+
+    파일은 메모리에 올리지 않고 그대로 전송한다. (가능하면 sendfile 사용)
+
+    :param path: 실제 파일 루트
+    :param name: 다운로드 될 파일 이름
+    """
+    media_type, _ = mimetypes.guess_type(name)
+    return FileResponse(
+        path,
+        filename=name,
+        media_type=media_type or 'application/octet-stream',
+    )
+
+
+def zip_streaming_response(
+    stream: Iterator[bytes], name: str
+) -> StreamingResponse:
+    """
+    디렉토리 압축 데이터를 그대로 흘려보내는 Response
+
+    :param stream: zip 데이터 chunk generator
+    :param name: 다운로드 될 파일 이름 (확장자 제외)
+    """
+    filename = quote(f'{name}.zip')
+    return StreamingResponse(
+        stream,
+        media_type='application/zip',
+        headers={
+            'Content-Disposition': f"attachment; filename*=utf-8''{filename}"
+        },
+    )
@@ -1,26 +1,110 @@
-from typing import Optional
-from dotenv import load_dotenv
-load_dotenv()
+from typing import TYPE_CHECKING, Optional, Tuple
+import os
 
-from system.connection.generators import DatabaseGenerator
+from settings.base import *
 
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
-import uvicorn
-import argparse
+_app: Optional['FastAPI'] = None
+# run-app 워커 프로세스에서 사용할 앱 타입 (dev, prod)
+_APP_TYPE_ENV = 'CLOUDMODULAR_APP_TYPE'
 
-from settings.base import *
-from system.bootloader import Bootloader
+def load_database():
+    """
+    데이터베이스 엔진 로드 (한번만)
+    모델을 import 하기 전에 호출되어야 한다.
+    """
+    from system.connection.generators import DatabaseGenerator
+    if DatabaseGenerator.db is None:
+        DatabaseGenerator.load(db_type=DATABASE['type'], **DATABASE['data'])
+
+def get_app(cors_origins: Optional[Tuple[str, ...]] = None) -> 'FastAPI':
+    """
+    앱은 처음 필요할 때 한번만 생성한다.
+    migrate, clean 명령에서는 앱(라우터, 스키마)을 만들지 않는다.
 
-# Engines
-DatabaseGenerator.load(db_type=DATABASE['type'], **DATABASE['data'])
+    :param cors_origins: CORS 허용 origin (처음 생성할 때만 적용)
+    """
+    global _app
+    if _app is None:
+        load_database()
+        from core.init import init_app
+        _app = init_app(cors_origins=cors_origins)
+    return _app
+
+def get_server_app(app_type: str) -> 'FastAPI':
+    """
+    run-app으로 실행되는 앱
+    CORS를 설정하고, prod인 경우 static web까지 추가한다.
+    """
+    from fastapi import Request
+    from fastapi.templating import Jinja2Templates
+    from fastapi.staticfiles import StaticFiles
+
+    # Cors 설정 (dev, prod 모두 전체 허용)
+    app = get_app(cors_origins=('*',))
+    if app_type == 'prod':
+        # Prod인 경우 staticweb까지 추가
+        templates = Jinja2Templates(directory='web')
+        app.mount('/static', StaticFiles(directory='web/static'), name='static')
+        # static webURL 추가
+        @app.get('/')
+        @app.get('/login/{path:path}')
+        @app.get('/storage/{path:path}')
+        @app.get('/setting/{path:path}')
+        @app.get('/error/{path:path}')
+        @app.get('/accounts/{path:path}')
+        async def index(request: Request):
+            return templates.TemplateResponse('index.html', {"request": request})
+    return app
 
-from core.init import init_app
-app: FastAPI = init_app()
+def set_workers(app_type: str) -> int:
+    """
+    run-app 워커 프로세스 수 결정
+
+    워커 프로세스들도 같은 값을 사용하도록 환경 변수(SERVER_WORKERS)로 전달한다.
+    워커가 여러 개면 프로세스 내부 캐시를 사용하지 않는다.
+    """
+    workers = 1
+    if app_type == 'prod':
+        # sqlite는 동시 쓰기가 불가능하므로 워커를 하나만 사용한다.
+        workers = SERVER['workers'] or (
+            1 if DATABASE['type'] == 'sqlite'
+            else (os.cpu_count() or 1) * 2 + 1)
+    if DATABASE['type'] != 'sqlite':
+        # 워커마다 커넥션이 최소 하나는 필요하다.
+        workers = min(workers, DATABASE['max-connections'])
+        set_pool_per_worker(workers)
+    os.environ['SERVER_WORKERS'] = str(workers)
+    SERVER['workers'] = workers
+    return workers
+
+def set_pool_per_worker(workers: int):
+    """
+    워커별 커넥션 풀 크기 결정
+
+    (pool_size + max_overflow) * 워커 수가 DB_MAX_CONNECTIONS를 넘지 않도록
+    나눠서 설정하고, 워커 프로세스에는 환경 변수로 전달한다.
+    DB_POOL_SIZE, DB_MAX_OVERFLOW는 상한으로 사용한다.
+    """
+    pool = DATABASE['data']['pool']
+    per_worker = max(1, DATABASE['max-connections'] // workers)
+    # 기본 설정(20:40)처럼 1/3은 유지, 나머지는 필요할 때만 연결
+    pool['pool_size'] = max(1, min(pool['pool_size'], per_worker // 3))
+    pool['max_overflow'] = max(
+        0, min(pool['max_overflow'], per_worker - pool['pool_size']))
+    os.environ['DB_POOL_SIZE'] = str(pool['pool_size'])
+    os.environ['DB_MAX_OVERFLOW'] = str(pool['max_overflow'])
+
+def __getattr__(name: str):
+    # from main import app (테스트, uvicorn main:app)
+    if name == 'app':
+        app_type = os.getenv(_APP_TYPE_ENV)
+        app = get_app() if app_type is None else get_server_app(app_type)
+        globals()['app'] = app
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 if __name__ == '__main__':
     """
@@ -35,7 +119,8 @@ if __name__ == '__main__':
     clean: remove ALL Data of database and storage
     """
 
-    # Parser 생성
+    # Parser 생성 (워커, 테스트에서 main을 import 할 때는 필요 없음)
+    import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument(
         '--method', 
@@ -55,54 +140,52 @@ if __name__ == '__main__':
     )
     args = parser.parse_args()
 
+    # run-app은 DB를 사용하기 전에 워커 수를 먼저 정한다.
+    workers = set_workers(args.type) if args.method == 'run-app' else 1
+    # 모든 명령이 데이터베이스를 사용한다.
+    load_database()
+    from system.bootloader import Bootloader
+    from system.connection.generators import DatabaseGenerator
+
     # 분기 실행
     if args.method == 'run-app':
         # APP 실행
+        import uvicorn
+
         # Admin이 있는 지 확인한 다음, 없으면 새로 생성한다.
         Bootloader.checking_admin()
 
-        # Cors 설정
-        origins = list()
-        if args.type == 'dev':
-            origins.append("*")
-        elif args.type == 'prod':
-            origins.append("*")
-            
-            # Prod인 경우 staticweb까지 추가
-            templates = Jinja2Templates(directory='web')
-            app.mount('/static', StaticFiles(directory='web/static'), name='static')
-            # static webURL 추가
-            @app.get('/')
-            @app.get('/login/{path:path}')
-            @app.get('/storage/{path:path}')
-            @app.get('/setting/{path:path}')
-            @app.get('/error/{path:path}')
-            @app.get('/accounts/{path:path}')
-            async def index(request: Request):
-                return templates.TemplateResponse('index.html', {"request": request})
-
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origins=origins,
-            allow_credentials=True,
-            allow_methods=['*'],
-            allow_headers=['token'],
+        if workers == 1:
+            # 로그인용 email 필터 로드
+            Bootloader.load_user_email_filter()
+            app = get_server_app(args.type)
+        else:
+            # 워커들은 main:app을 각자 import 한다.
+            # email 필터, 캐시는 워커 사이에 공유되지 않으므로 사용하지 않는다.
+            os.environ[_APP_TYPE_ENV] = args.type
+            app = 'main:app'
+            # 워커들의 커넥션만 남도록 이 프로세스의 커넥션은 닫는다.
+            DatabaseGenerator.get_engine().dispose()
+
+        uvicorn.run(
+            app,
+            host='0.0.0.0',
+            port=SERVER['port'],
+            workers=workers,
+            # uvloop, httptools가 설치되어 있으면 사용
+            loop='auto',
+            http='auto',
+            log_level='warning' if args.type == 'prod' else 'info',
+            access_log=args.type == 'dev',
         )
-        uvicorn.run(app, host='0.0.0.0', port=SERVER['port'])
-
-    elif args.method == 'migrate':
-        # Database, Storage Migration
-        if args.type == 'dev':
-            Bootloader.migrate_database()
-            Bootloader.init_storage()
-        elif args.type == 'prod':
-            Bootloader.migrate_database()
-            Bootloader.init_storage()
-    elif args.method == 'clean':
-        # 데이터 전부 삭제
-        if args.type == 'prod':
-            Bootloader.remove_storage()
-            Bootloader.remove_database()
-        elif args.type == 'dev':
-            Bootloader.remove_storage()
-            Bootloader.remove_database()
+
+    else:
+        # migrate, clean은 dev, prod 모두 같은 작업을 수행한다.
+        commands = {
+            # Database, Storage Migration
+            'migrate': (Bootloader.migrate_database, Bootloader.init_storage),
+            # 데이터 전부 삭제
+            'clean': (Bootloader.remove_storage, Bootloader.remove_database),
+        }
+        for command in commands[args.method]:
+            command()
@@ -1,7 +1,24 @@
 import os
 
-from dotenv import load_dotenv
-load_dotenv()
+# .env 파일은 개발 환경에서만 읽는다.
+# 배포 환경(CLOUDMODULAR_ENV=prod)에서는 환경 변수가 이미 주입되어 있다.
+if os.getenv('CLOUDMODULAR_ENV', 'dev') == 'dev':
+    from dotenv import load_dotenv
+    load_dotenv()
+
+def _get_database_pool():
+    """
+    커넥션 풀 설정 (MySQL, MariaDB)
+
+    풀은 프로세스마다 따로 생기므로 run-app 실행 시
+    DB_MAX_CONNECTIONS와 워커 수에 맞춰 main.py에서 다시 계산한다.
+    """
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '20')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '40')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    }
 
 def _get_database_info():
     t = os.getenv('DB_TYPE')
@@ -14,6 +31,7 @@ def _get_database_info():
             'database': os.getenv('DB_DATABASE'),
             'user': os.getenv('DB_USER'),
             'passwd': os.getenv('DB_PASSWD'),
+            'pool': _get_database_pool(),
         }
 
 SERVER = {
@@ -22,10 +40,15 @@ SERVER = {
     'storage': os.getenv('SERVER_STORAGE') + '/cloudmodular',
     'data-shared-length': int(os.getenv('DATA_SHARED_LENGTH')) * 24 * 60,
     'maximum-upload-size': int(os.getenv('MAX_UPLOAD_LEN')),
+    # prod 워커 프로세스 수, 0이면 자동으로 결정한다.
+    'workers': int(os.getenv('SERVER_WORKERS', '0')),
 }
 DATABASE = {
     'type': os.getenv('DB_TYPE'),
     'data': _get_database_info(),
+    # 서버 전체(모든 워커)가 사용할 수 있는 최대 커넥션 수
+    # MySQL 기본 max_connections(151)보다 작게 잡는다.
+    'max-connections': int(os.getenv('DB_MAX_CONNECTIONS', '100')),
 }
 ADMIN = {
     'email': os.getenv('ADMIN_EMAIL'),
@@ -35,4 +58,8 @@ ADMIN = {
 JWT = {
     'key': os.getenv('JWT_KEY'),
     'algorithm': os.getenv('JWT_ALGORITHM'),
-}
\ No newline at end of file
+}
+PASSWD = {
+    # bcrypt cost, 테스트 외에는 기본값(12) 이상을 유지한다.
+    'bcrypt-rounds': int(os.getenv('BCRYPT_ROUNDS', '12')),
+}
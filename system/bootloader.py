@@ -57,12 +57,23 @@ class Bootloader:
         Base = DatabaseGenerator.get_base()
         db_engine = DatabaseGenerator.get_engine()
         Base.metadata.create_all(db_engine)
+        # 이미 존재하는 테이블에 새로 추가된 인덱스 생성
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db_engine, checkfirst=True)
 
     @staticmethod
     def remove_database():
         """
         데이터베이스 초기화
         """
+        from apps.data_tag.utils.queries import DataTagQuery
+        from apps.user.utils.managers import LOGIN_USER_CACHE, OPERATOR_CACHE
+
+        # 지워진 사용자 정보가 캐시에 남지 않도록 같이 비운다.
+        LOGIN_USER_CACHE.clear()
+        OPERATOR_CACHE.clear()
+        DataTagQuery.invalidate()
         if DATABASE['type'] == 'sqlite':
             """
             SQLITE일 경우 자체 삭제
@@ -103,3 +114,19 @@ class Bootloader:
                 storage_size=5,
             ))
             UserStorageQuery().create(user_id=admin_data.id, force=True)
+
+    @staticmethod
+    def load_user_email_filter():
+        """
+        로그인 시 존재하지 않는 email을 DB 조회 없이 거르기 위해
+        현재 등록된 모든 email을 Bloom Filter에 등록한다.
+        """
+        from apps.user.models import User
+        from apps.user.utils.managers import USER_EMAIL_FILTER
+
+        session = DatabaseGenerator.get_session()
+        try:
+            emails = [email for email, in session.query(User.email)]
+        finally:
+            session.close()
+        USER_EMAIL_FILTER.load(emails)